@@ -1,5 +1,137 @@
+# python imports
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# 3rd party imports
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
+
+# application imports
+from src.app.config import celery_settings
+from src.app.database import AsyncSessionFactory
+from src.app.utils.mailer_util import send_mail, template_renderer
+from src.app.utils.timing_utils import timed
+from src.auth.auth_repository import token_repo
 
-job = Celery("SAAS Template", broker="redis://localhost:6379/0")
+job = Celery("SAAS Template", broker=celery_settings.celery_broker_url)
 job.conf.enable_utc = True
+job.conf.task_always_eager = celery_settings.celery_task_always_eager
+# a mail task is only acknowledged once it ran, so a worker crash redelivers it
+job.conf.task_acks_late = True
+# celery beat schedule
+job.conf.beat_schedule = {
+    "purge-expired-refresh-tokens": {
+        "task": "auth.purge_expired_refresh_tokens",
+        "schedule": crontab(minute=0),
+    },
+}
+
+
+# one long lived event loop per worker thread, so the SMTP pool of that loop
+# keeps its connections open between tasks
+worker_loops = threading.local()
+
+
+def run_in_worker_loop(coro):
+    loop = getattr(worker_loops, "loop", None)
+    if loop is None:
+        loop = worker_loops.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def load_mail_templates(**kwargs) -> None:
+    # compile mail templates once per worker process
+    template_renderer.load_all()
+
+
+class MailNotSent(Exception):
+    # raised by send_mail_task so Celery retries it
+    pass
+
+
+@job.task(
+    name="mail.send",
+    autoretry_for=(MailNotSent,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=5,
+)
+def send_mail_task(
+    recieptients: List[str], subject: str, body: dict, template_name: str
+) -> bool:
+    """Send Mail Task
+
+    Args:
+        recieptients (List[str]): Array of Email
+        subject (str): Mail Subject
+        body (dict): an Hashmap/Dict of  data
+        template_name (str): the template name
+
+    Returns:
+        bool: True, failures raise MailNotSent and are retried with backoff.
+    """
+    status = run_in_worker_loop(send_mail(recieptients, subject, body, template_name))
+    if not status:
+        raise MailNotSent(f"{subject} to {recieptients}")
+    return status
+
+
+async def purge_expired_refresh_tokens(batch_size: int) -> int:
+    async with AsyncSessionFactory() as db:
+        return await token_repo(db).delete_expired(batch_size)
+
+
+@job.task(name="auth.purge_expired_refresh_tokens")
+def purge_expired_refresh_tokens_task(batch_size: int = 1000) -> int:
+    """Purge Expired Refresh Tokens
+
+    Args:
+        batch_size (int): rows deleted per transaction.
+
+    Returns:
+        int: expired refresh tokens deleted.
+    """
+    return run_in_worker_loop(purge_expired_refresh_tokens(batch_size))
+
+
+# Broker publishes get their own threads, like bcrypt, so a slow broker never
+# holds the shared anyio thread pool that sync routes and dependencies run on.
+publish_executor = ThreadPoolExecutor(
+    max_workers=celery_settings.celery_publish_workers,
+    thread_name_prefix="mail-publish",
+)
+
+
+async def enqueue_mail(
+    recieptients: List[str], subject: str, body: dict, template_name: str
+) -> bool:
+    """Enqueue Mail
+
+    Publishing talks to the broker (and runs the task inline when eager),
+    so it happens off the event loop on publish_executor.
+
+    Returns:
+        bool: status on the mail being queued.
+    """
+    # the request context goes along, so an eager send lands on its timings
+    publish = functools.partial(
+        contextvars.copy_context().run,
+        send_mail_task.delay,
+        recieptients,
+        subject,
+        body,
+        template_name,
+    )
+    try:
+        with timed("mail"):
+            await asyncio.get_running_loop().run_in_executor(publish_executor, publish)
+    except Exception:
+        return False
+    return True
@@ -15,6 +15,12 @@ class DBSettings(AbstractSettings):
     password: str
     hostname: str
     port: int
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    pool_use_lifo: bool = False
 
 
 class AuthSettings(AbstractSettings):
@@ -30,6 +36,15 @@ class AuthSettings(AbstractSettings):
     refresh_time_exp: int
     algorithm: str
     frontend_url: str
+    principal_cache_size: int = 10000
+    principal_cache_ttl: int = 60
+    jwt_cache_size: int = 10000
+    stateless_access_tokens: bool = False
+    token_version_cache_ttl: int = 30
+    hashing_workers: int = 4
+    hashing_max_pending: int = 64
+    internal_token: Optional[str] = None
+    max_sessions_per_user: int = 20
 
 
 class MailSettings(AbstractSettings):
@@ -45,6 +60,20 @@ class MailSettings(AbstractSettings):
     mail_port: int
     mail_server: str
     mail_from_name: str
+    mail_pool_size: int = 4
+    mail_max_messages_per_connection: int = 100
+
+
+class CelerySettings(AbstractSettings):
+    """Celery Settings
+
+    Args:
+        AbstractSettings (_type_): inherits Core settings.
+    """
+
+    celery_broker_url: str = "redis://localhost:6379/0"
+    celery_task_always_eager: bool = False
+    celery_publish_workers: int = 4
 
 
 class TestSettings(AbstractSettings):
@@ -54,4 +83,5 @@ class TestSettings(AbstractSettings):
 db_settings = DBSettings()
 auth_settings = AuthSettings()
 mail_settings = MailSettings()
+celery_settings = CelerySettings()
 test_status = TestSettings()
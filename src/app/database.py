@@ -1,18 +1,53 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 # application import config.
 from src.app.config import db_settings
+from src.app.utils.pool_utils import AsyncTimedQueuePool, TimedQueuePool
+from src.app.utils.timing_utils import register_query_timing
 
 # DB URL for connection
 SQLALCHEMY_DATABASE_URL = f"postgresql://{db_settings.username}:{db_settings.password}@{db_settings.hostname}:{db_settings.port}/{db_settings.name}"
+# Async DB URL (asyncpg driver)
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace(
+    "postgresql://", "postgresql+asyncpg://", 1
+)
+
+# Connection pool tuning, shared by the sync and async engines.
+pool_options = {
+    "pool_size": db_settings.pool_size,
+    "max_overflow": db_settings.max_overflow,
+    "pool_timeout": db_settings.pool_timeout,
+    "pool_recycle": db_settings.pool_recycle,
+    "pool_pre_ping": db_settings.pool_pre_ping,
+    "pool_use_lifo": db_settings.pool_use_lifo,
+}
 
 # Creating DB engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool, **pool_options
+)
 
 # Creating and Managing session.
 SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Creating async DB engine, used by the request path.
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=AsyncTimedQueuePool, **pool_options
+)
+
+# SQL time per request, reported by TimingMiddleware
+register_query_timing(async_engine.sync_engine)
+
+# Creating and Managing async session.
+# expire_on_commit is off so committed instances can still be serialized
+# without an implicit (and in asyncio, illegal) refresh.
+AsyncSessionFactory = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Domain Modelling Dependency
 Base = declarative_base()
 
@@ -20,6 +55,17 @@ Base = declarative_base()
 TEST_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL + "_test"
 test_engine = create_engine(TEST_SQLALCHEMY_DATABASE_URL)
 TestFactory = sessionmaker(autoflush=False, autocommit=False, bind=test_engine)
+
+# TestClient runs every request on a fresh event loop, asyncpg connections
+# cannot be shared across loops so the test engine does not pool.
+TEST_ASYNC_SQLALCHEMY_DATABASE_URL = ASYNC_SQLALCHEMY_DATABASE_URL + "_test"
+async_test_engine = create_async_engine(
+    TEST_ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool
+)
+register_query_timing(async_test_engine.sync_engine)
+AsyncTestFactory = async_sessionmaker(
+    bind=async_test_engine, autoflush=False, expire_on_commit=False
+)
 print("Database is Ready!")
 
 
@@ -1,16 +1,31 @@
 # python imports
+import os
 from typing import List
 
 # fastapi  imports
 from fastapi import Depends, FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from prometheus_client import multiprocess
 
 # application imports
+from src.app.database import async_engine
+from src.app.utils.db_utils import hashing_executor
+from src.app.utils.internal_utils import internal_only
+from src.app.utils.mailer_util import template_renderer
+from src.app.utils.metrics_utils import (
+    MetricsMiddleware,
+    init_route_metrics,
+    multiprocess_mode,
+    render_metrics,
+)
+from src.app.utils.pool_utils import pool_status
+from src.app.utils.timing_utils import TimingMiddleware
 from src.auth.auth_router import user_router
 from src.organization.org_router import org_router
 
 # fastapi initialization
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 # CORS Middleware
@@ -23,15 +38,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Route metrics, inside TimingMiddleware so it sees the request's SQL count
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+# Server-Timing breakdown and a timing log line per request
+app.add_middleware(TimingMiddleware)
+
+
+# compile mail templates once per worker
+@app.on_event("startup")
+def load_mail_templates() -> None:
+    template_renderer.load_all()
+
+
+# drop this worker's live gauges from the multiprocess aggregate
+@app.on_event("shutdown")
+def mark_metrics_process_dead() -> None:
+    if multiprocess_mode:
+        multiprocess.mark_process_dead(os.getpid())
+
 
 # Routers from the application
 app.include_router(user_router)
 app.include_router(org_router)
 
+# latency series for every auth and org route, before their first request
+init_route_metrics(user_router.routes)
+init_route_metrics(org_router.routes)
+
 
 # root of the server
 @app.get("/", status_code=status.HTTP_200_OK)
 def root() -> dict:
     return {"message": "Welcome to FastAPI SAAS Template", "docs": "/docs"}
+
+
+# internal: connection pool status of the request path engine
+@app.get(
+    "/internal/db-pool/",
+    status_code=status.HTTP_200_OK,
+    include_in_schema=False,
+    dependencies=[Depends(internal_only)],
+)
+def db_pool() -> dict:
+    return {
+        "message": "DB Pool Status",
+        "data": pool_status(async_engine.sync_engine.pool),
+        "status": status.HTTP_200_OK,
+    }
+
+
+# internal: password hashing executor load
+@app.get(
+    "/internal/password-hashing/",
+    status_code=status.HTTP_200_OK,
+    include_in_schema=False,
+    dependencies=[Depends(internal_only)],
+)
+def password_hashing() -> dict:
+    return {
+        "message": "Password Hashing Status",
+        "data": hashing_executor.stats(),
+        "status": status.HTTP_200_OK,
+    }
+
+
+# Prometheus metrics, aggregated over every worker in multiprocess mode
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(internal_only)])
+def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
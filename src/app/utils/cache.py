@@ -0,0 +1,73 @@
+# python imports
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# application imports
+from src.app.utils.metrics_utils import CACHE_REQUESTS
+
+
+class TTLCache:
+    """Bounded TTL Cache
+
+    In-process LRU cache whose entries also expire after a time to live.
+
+    Args:
+        maxsize (int): maximum number of entries, the least recently used is dropped first.
+        ttl (float): default time to live in seconds.
+        name (Optional[str]): exports hits and misses as cache_requests_total.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hit_counter = CACHE_REQUESTS.labels(name, "hit") if name else None
+        self.miss_counter = CACHE_REQUESTS.labels(name, "miss") if name else None
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        # return a live entry and mark it as recently used
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.data.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            if self.miss_counter is not None:
+                self.miss_counter.inc()
+            return None
+        if self.hit_counter is not None:
+            self.hit_counter.inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        # store an entry, evicting the least recently used when full
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.data[key] = (expires_at, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        # drop an entry if present
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
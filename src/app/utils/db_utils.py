@@ -1,5 +1,18 @@
+# python imports
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# framework imports
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
-from src.app.database import SessionFactory
+
+# application imports
+from src.app.config import auth_settings
+from src.app.database import AsyncSessionFactory
+from src.app.utils.metrics_utils import PASSWORD_HASH_REJECTED, THREADPOOL_BUSY
+from src.app.utils.timing_utils import timed
 # Password Hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -29,14 +42,82 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class HashingExecutor:
+    """Password Hashing Executor
+
+    Dedicated thread pool for bcrypt so hashing neither blocks the event loop
+    nor competes with the shared anyio thread pool. Work beyond max_pending
+    is rejected with a 503 instead of queueing without bound.
+
+    Args:
+        max_workers (int): hashing threads.
+        max_pending (int): running plus queued jobs allowed.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_gauge = THREADPOOL_BUSY.labels("password-hash")
+
+    async def run(self, func: Callable, *args):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                PASSWORD_HASH_REJECTED.inc()
+                raise HTTPException(
+                    detail="Server is busy, please retry",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+            self.pending += 1
+        self.busy_gauge.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            with timed("bcrypt"):
+                return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.busy_gauge.dec()
+            with self.lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.pending,
+                "queue_depth": max(self.pending - self.max_workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+hashing_executor = HashingExecutor(
+    auth_settings.hashing_workers, auth_settings.hashing_max_pending
+)
+
+
+async def async_verify_password(hashed_password: str, plain_password: str) -> bool:
+    # verify_password on the hashing executor
+    return await hashing_executor.run(verify_password, hashed_password, plain_password)
+
+
+async def async_hash_password(password: str) -> str:
+    # hash_password on the hashing executor
+    return await hashing_executor.run(hash_password, password)
 
-def get_db():
-    db = SessionFactory()
 
-    try:
-        yield db
-    except: 
-        db.rollback()
-        
-    finally:
-        db.close()
\ No newline at end of file
+async def get_db():
+    async with AsyncSessionFactory() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
@@ -0,0 +1,41 @@
+# python imports
+import secrets
+from typing import Optional
+
+# fastapi imports
+from fastapi import Header, HTTPException, status
+
+# application imports
+from src.app.config import auth_settings
+
+
+def internal_only(
+    x_internal_token: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None),
+) -> None:
+    """Internal Only
+
+    Guards operational routes. They answer only to the INTERNAL_TOKEN, sent as
+    the X-Internal-Token header or as a bearer token (what a Prometheus scrape
+    job's authorization setting sends), and are disabled while no token is
+    configured.
+
+    Args:
+        x_internal_token (Optional[str]): X-Internal-Token header.
+        authorization (Optional[str]): Authorization header.
+
+    Raises:
+        HTTPException: 404, the route is hidden from everyone else.
+    """
+    expected = auth_settings.internal_token
+    token = x_internal_token
+    if token is None and authorization:
+        scheme, _, credentials = authorization.partition(" ")
+        if scheme.lower() == "bearer":
+            token = credentials
+    if (
+        not expected
+        or token is None
+        or not secrets.compare_digest(token.encode(), expected.encode())
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
@@ -1,11 +1,21 @@
+# python imports
+import asyncio
+import socket
+import weakref
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 # 3rd party imports
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+from jinja2 import Environment, FileSystemLoader, Template
 
 # application imports
 from src.app.config import EmailStr, mail_settings
+from src.app.utils.metrics_utils import MAIL_SENT
+from src.app.utils.timing_utils import timed
 
 # conf configuration
 conf = ConnectionConfig(
@@ -23,6 +33,200 @@ conf = ConnectionConfig(
 )
 
 
+class TemplateRenderer:
+    """Mail Template Renderer
+
+    Compiles each template once and keeps the compiled object, instead of
+    building a Jinja environment and resolving the template on every send.
+
+    Args:
+        folder (Path): template folder.
+    """
+
+    def __init__(self, folder: Path) -> None:
+        # templates are read once, no mtime checks on render
+        self.env = Environment(loader=FileSystemLoader(folder), auto_reload=False)
+        self.templates: Dict[str, Template] = {}
+
+    def load_all(self) -> None:
+        # compile every template up front, called on startup
+        for template_name in self.env.list_templates():
+            self.get(template_name)
+
+    def get(self, template_name: str) -> Template:
+        template_name = template_name.lstrip("/")
+        template = self.templates.get(template_name)
+        if template is None:
+            template = self.templates[template_name] = self.env.get_template(
+                template_name
+            )
+        return template
+
+    def render(self, template_name: str, body: dict) -> str:
+        return self.get(template_name).render(**body)
+
+
+template_renderer = TemplateRenderer(conf.TEMPLATE_FOLDER)
+
+# resolved once, aiosmtplib would otherwise call the blocking getfqdn per connection
+local_hostname = socket.gethostname()
+
+
+class SMTPPool:
+    """SMTP Connection Pool
+
+    Keeps up to size authenticated SMTP connections open and reuses them for
+    many messages. A connection is recycled after max_messages sends, and a
+    send on a connection the server dropped reconnects and retries once.
+    Connections belong to the event loop that opened them, use get_smtp_pool.
+
+    Args:
+        hostname (str): SMTP server.
+        port (int): SMTP port.
+        username (Optional[str]): login, None to skip AUTH.
+        password (Optional[str]): password.
+        start_tls (bool): upgrade with STARTTLS on connect.
+        validate_certs (bool): validate the server certificate.
+        size (int): maximum open connections.
+        max_messages (int): messages sent before a connection is recycled.
+        timeout (float): connect and command timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        validate_certs: bool = True,
+        size: int = 4,
+        max_messages: int = 100,
+        timeout: float = 30,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.validate_certs = validate_certs
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(size)
+        self.idle: List[aiosmtplib.SMTP] = []
+        self.sent = {}
+        self.connections_opened = 0
+
+    async def connect(self) -> aiosmtplib.SMTP:
+        # open, upgrade and authenticate a new connection
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+            local_hostname=local_hostname,
+        )
+        await smtp.connect()
+        self.connections_opened += 1
+        self.sent[id(smtp)] = 0
+        return smtp
+
+    async def discard(self, smtp: aiosmtplib.SMTP) -> None:
+        # close a connection, politely when it is still up
+        self.sent.pop(id(smtp), None)
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except aiosmtplib.SMTPException:
+            smtp.close()
+
+    async def acquire(self) -> aiosmtplib.SMTP:
+        while self.idle:
+            smtp = self.idle.pop()
+            if smtp.is_connected:
+                return smtp
+            await self.discard(smtp)
+        return await self.connect()
+
+    async def release(self, smtp: aiosmtplib.SMTP) -> None:
+        if smtp.is_connected and self.sent.get(id(smtp), 0) < self.max_messages:
+            self.idle.append(smtp)
+        else:
+            await self.discard(smtp)
+
+    async def send(self, message: EmailMessage) -> None:
+        """Send Message
+
+        Args:
+            message (EmailMessage): message with From and To headers set.
+
+        Raises:
+            aiosmtplib.SMTPException: when the message could not be delivered.
+        """
+        with timed("smtp"):
+            await self.send_on_pool(message)
+
+    async def send_on_pool(self, message: EmailMessage) -> None:
+        async with self.slots:
+            smtp = await self.acquire()
+            try:
+                try:
+                    await smtp.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # idle connection was dropped by the server, reconnect once
+                    await self.discard(smtp)
+                    smtp = await self.connect()
+                    await smtp.send_message(message)
+            except Exception:
+                await self.discard(smtp)
+                raise
+            self.sent[id(smtp)] = self.sent.get(id(smtp), 0) + 1
+            await self.release(smtp)
+
+    async def close(self) -> None:
+        while self.idle:
+            await self.discard(self.idle.pop())
+
+
+# one pool per event loop
+smtp_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SMTPPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_smtp_pool() -> SMTPPool:
+    # SMTP pool of the running event loop
+    loop = asyncio.get_running_loop()
+    pool = smtp_pools.get(loop)
+    if pool is None:
+        pool = SMTPPool(
+            hostname=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            username=conf.MAIL_USERNAME if conf.USE_CREDENTIALS else None,
+            password=conf.MAIL_PASSWORD if conf.USE_CREDENTIALS else None,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+            size=mail_settings.mail_pool_size,
+            max_messages=mail_settings.mail_max_messages_per_connection,
+            timeout=conf.TIMEOUT,
+        )
+        smtp_pools[loop] = pool
+    return pool
+
+
+def build_message(recieptients: List[str], subject: str, html: str) -> EmailMessage:
+    # html message from the configured sender
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME, conf.MAIL_FROM))
+    message["To"] = ", ".join(recieptients)
+    message["Subject"] = subject
+    message.set_content(html, subtype="html")
+    return message
+
+
 async def send_mail(
     recieptients: List[EmailStr], subject: str, body: dict, template_name: str
 ) -> bool:
@@ -37,18 +241,12 @@ async def send_mail(
     Returns:
         bool: status on success or failure.
     """
-    message = MessageSchema(
-        subject=subject,
-        recipients=recieptients,
-        template_body=body,
-        subtype=MessageType.html,
-    )
-    fm = FastMail(conf)
-
     status = False
     try:
-        await fm.send_message(message, template_name=template_name)
+        html = template_renderer.render(template_name, body)
+        await get_smtp_pool().send(build_message(recieptients, subject, html))
         status = True
     except Exception as e:
         pass
+    MAIL_SENT.labels("success" if status else "failure").inc()
     return status
@@ -0,0 +1,159 @@
+# python imports
+import os
+import time
+from typing import Dict, Iterable, Tuple
+
+# 3rd party imports
+from anyio.to_thread import current_default_thread_limiter
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.routing import BaseRoute
+
+# application imports
+from src.app.utils.timing_utils import request_timings
+
+# With PROMETHEUS_MULTIPROC_DIR set (before the workers start) every process
+# writes its samples to that directory and /metrics aggregates all of them.
+multiprocess_mode = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+    multiprocess_mode="livesum",
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, float("inf")),
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time waited for a pooled connection, connect time included",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that hit pool_timeout"
+)
+THREADPOOL_BUSY = Gauge(
+    "threadpool_busy_threads",
+    "Busy worker threads by pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hashing jobs rejected with a 503"
+)
+MAIL_SENT = Counter("mail_sent_total", "send_mail results", ["result"])
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "In-process cache lookups", ["cache", "result"]
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_paths(routes: Iterable[BaseRoute]) -> Dict:
+    # endpoint -> path template, used as the route label
+    return {
+        route.endpoint: route.path for route in routes if hasattr(route, "endpoint")
+    }
+
+
+def init_route_metrics(routes: Iterable[BaseRoute]) -> None:
+    # export every route's latency series from the start, not only once hit
+    for route in routes:
+        for method in getattr(route, "methods", None) or ():
+            REQUEST_LATENCY.labels(method, route.path)
+            REQUEST_QUERIES.labels(route.path)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render Metrics
+
+    Returns:
+        Tuple[bytes, str]: exposition body and its content type.
+    """
+    if multiprocess_mode:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Request Metrics Middleware
+
+    Records latency, status, in-flight requests and SQL statements per request
+    labelled by route template. Runs inside TimingMiddleware, whose per request
+    timings supply the SQL count.
+
+    Args:
+        app (_type_): ASGI app.
+        routes (Iterable[BaseRoute]): app routes, mapped to their path template.
+    """
+
+    def __init__(self, app, routes: Iterable[BaseRoute]) -> None:
+        self.app = app
+        self.routes = routes
+        self.paths: Dict = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        THREADPOOL_BUSY.labels("anyio").set(
+            current_default_thread_limiter().borrowed_tokens
+        )
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = self.route_label(scope)
+            REQUEST_LATENCY.labels(scope["method"], route).observe(
+                time.perf_counter() - start
+            )
+            REQUESTS.labels(scope["method"], route, status_code).inc()
+            timings = request_timings.get()
+            queries = timings["db"][1] if timings and "db" in timings else 0
+            REQUEST_QUERIES.labels(route).observe(queries)
+
+    def route_label(self, scope) -> str:
+        # the router leaves the matched endpoint on the scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self.paths.get(endpoint)
+        if path is None:
+            self.paths = route_paths(self.routes)
+            path = self.paths.setdefault(endpoint, UNMATCHED_ROUTE)
+        return path
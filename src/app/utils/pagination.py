@@ -0,0 +1,54 @@
+# python imports
+from typing import List, Optional, Tuple
+
+# framework imports
+from fastapi import HTTPException, status
+
+# application imports
+from src.app.utils.token import gen_cursor_token, retrieve_cursor_token
+
+# page size bounds for keyset paginated listings
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+# members embedded per org in org responses, the rest are paged via the members route
+EMBEDDED_MEMBERS = 10
+
+
+def encode_cursor(last_id: int) -> str:
+    # opaque, signed cursor pointing after last_id
+    return gen_cursor_token(last_id)
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Decode Cursor
+
+    Args:
+        cursor (Optional[str]): cursor from a previous page, None for the first page.
+
+    Returns:
+        Optional[int]: id to continue after.
+    """
+    if cursor is None:
+        return None
+    last_id = retrieve_cursor_token(cursor)
+    if not isinstance(last_id, int):
+        raise HTTPException(
+            detail="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return last_id
+
+
+def paginate(rows: List, limit: int) -> Tuple[List, Optional[str]]:
+    """Paginate
+
+    Args:
+        rows (List): up to limit + 1 rows ordered by id.
+        limit (int): page size.
+
+    Returns:
+        Tuple[List, Optional[str]]: the page and the next cursor, None on the last page.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
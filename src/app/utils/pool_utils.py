@@ -0,0 +1,98 @@
+# python imports
+import threading
+import time
+
+# 3rd party imports
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# application imports
+from src.app.utils.metrics_utils import POOL_CHECKOUT_TIMEOUTS, POOL_CHECKOUT_WAIT
+
+
+class PoolStats:
+    """Pool Stats
+
+    Counters for connection checkouts, kept on the pool instance.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record(self, wait_time: float, timed_out: bool = False) -> None:
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+        if timed_out:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+        else:
+            POOL_CHECKOUT_WAIT.observe(wait_time)
+
+
+class TimedPoolMixin:
+    """Timed Pool
+
+    Measures how long each checkout waits for a connection, including the
+    connect time when the pool has to open a new one.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class AsyncTimedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Pool) -> dict:
+    """Pool Status
+
+    Args:
+        pool (Pool): engine pool
+
+    Returns:
+        dict: checked out, idle, overflow and checkout wait counters.
+    """
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        with stats.lock:
+            status.update(
+                {
+                    "checkouts": stats.checkouts,
+                    "timeouts": stats.timeouts,
+                    "wait_time_total": round(stats.wait_time_total, 6),
+                    "wait_time_max": round(stats.wait_time_max, 6),
+                }
+            )
+    return status
@@ -0,0 +1,45 @@
+# python imports
+from typing import Any, Type
+
+# 3rd party imports
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class ModelResponse(ORJSONResponse):
+    """Response Model fast path
+
+    Renders a parsed pydantic response model straight to bytes with orjson,
+    skipping FastAPI's response_model re-validation and jsonable_encoder walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=model_fields, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+def model_fields(obj: Any) -> dict:
+    # orjson fallback, a validated model's __dict__ holds exactly its field values
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError
+
+
+def model_response(
+    response_model: Type[BaseModel], content: Any, status_code: int
+) -> ModelResponse:
+    """Model Response
+
+    Args:
+        response_model (Type[BaseModel]): the route's response model.
+        content (Any): service response, may hold ORM objects (orm_mode).
+        status_code (int): HTTP status.
+
+    Returns:
+        ModelResponse: parsed once and serialized once. Dicts and ORM objects
+        are validated by parse_obj, DTOs built with construct (the org mappers)
+        are trusted as they are and only copied.
+    """
+    return ModelResponse(response_model.parse_obj(content), status_code=status_code)
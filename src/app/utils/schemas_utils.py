@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 
 from pydantic import BaseModel, BaseSettings, EmailStr
 
@@ -37,6 +38,16 @@ class ResponseModel(AbstractModel):
     status: int
 
 
+class PaginatedResponseModel(ResponseModel):
+    """Keyset Paginated Response Models
+
+    Args:
+        ResponseModel (_type_): Inherits ResponseModel, next_cursor is None on the last page.
+    """
+
+    next_cursor: Optional[str]
+
+
 class RoleOptions(Enum):
     admin = "Admin"
     member = "Member"
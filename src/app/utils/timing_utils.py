@@ -0,0 +1,128 @@
+# python imports
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# 3rd party imports
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("src.app.timing")
+
+# phase -> [seconds, count] for the request being served. The dict is shared
+# by reference, so time recorded in tasks, greenlets and threads spawned by the
+# request (which all copy the context) lands on the request.
+request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def record(phase: str, seconds: float) -> None:
+    # add time spent in a phase to the current request, no-op outside requests
+    timings = request_timings.get()
+    if timings is None:
+        return
+    timing = timings.get(phase)
+    if timing is None:
+        timings[phase] = [seconds, 1]
+    else:
+        timing[0] += seconds
+        timing[1] += 1
+
+
+@contextmanager
+def timed(phase: str):
+    # time the block and record it under phase
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+def register_query_timing(engine: Engine) -> None:
+    """Register Query Timing
+
+    Args:
+        engine (Engine): sync engine, pass async_engine.sync_engine for asyncio.
+    """
+
+    # the start time lives on the statement's execution context, a statement
+    # that fails never reaches after_cursor_execute and leaves nothing behind
+    # on the pooled connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        record("db", time.perf_counter() - context._query_start)
+
+
+def server_timing(timings: Dict[str, List[float]], total: float) -> str:
+    # Server-Timing header value, durations in milliseconds
+    metrics = [
+        f'{phase};dur={seconds * 1000:.1f};desc="{count:g}x"'
+        for phase, (seconds, count) in timings.items()
+    ]
+    metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
+
+
+class TimingMiddleware:
+    """Request Timing Middleware
+
+    Measures each HTTP request and the time it spent in SQL, bcrypt, JWT
+    verification and SMTP, returns the breakdown as a Server-Timing header and
+    logs it as one JSON line on the src.app.timing logger.
+
+    Args:
+        app (_type_): ASGI app.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                header = server_timing(timings, time.perf_counter() - start)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            total = time.perf_counter() - start
+            if logger.isEnabledFor(logging.INFO):
+                line = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "total_ms": round(total * 1000, 1),
+                }
+                for phase, (seconds, count) in timings.items():
+                    line[f"{phase}_ms"] = round(seconds * 1000, 1)
+                    line[f"{phase}_count"] = count
+                logger.info(orjson.dumps(line).decode())
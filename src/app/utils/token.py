@@ -1,3 +1,6 @@
+# python imports
+import hashlib
+
 # Token generation 3rd party generation
 from itsdangerous.exc import BadSignature
 from itsdangerous.url_safe import URLSafeSerializer, URLSafeTimedSerializer
@@ -10,6 +13,12 @@ tokens = URLSafeSerializer(
     f"{auth_settings.access_secret_key}+{auth_settings.refresh_secret_key}"
 )
 invite_tokens = URLSafeTimedSerializer(f"{auth_settings.refresh_secret_key}")
+# pagination cursors get their own salt, so a cursor never passes as an invite
+# or role token and the other way round
+cursor_tokens = URLSafeSerializer(
+    f"{auth_settings.access_secret_key}+{auth_settings.refresh_secret_key}",
+    salt="cursor",
+)
 
 
 def gen_token(data: str):
@@ -33,6 +42,11 @@ def retrieve_token(token: str):
     return data
 
 
+def token_digest(token: str) -> bytes:
+    # fixed length sha256 digest, stored and looked up instead of the raw token
+    return hashlib.sha256(token.encode()).digest()
+
+
 def auth_retrieve_token(token: str):
     # return data from the token
 
@@ -41,3 +55,17 @@ def auth_retrieve_token(token: str):
     except BadSignature:
         return None
     return data
+
+
+def gen_cursor_token(data: int) -> str:
+    # signed pagination cursor
+    return cursor_tokens.dumps(data)
+
+
+def retrieve_cursor_token(token: str):
+    # return data from a pagination cursor
+    try:
+        data = cursor_tokens.loads(token)
+    except BadSignature:
+        return None
+    return data
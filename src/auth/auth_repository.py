@@ -1,82 +1,198 @@
+# python imports
+from datetime import timedelta
+from typing import Optional
+
 # Pydantic imports
 from pydantic import EmailStr
 
 # application import
+from src.app.config import auth_settings
+from src.app.utils.cache import TTLCache
 from src.auth.models import RefreshToken, User
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+# Principal cache: email -> schemas.Principal, evicted on every user write.
+principal_cache = TTLCache(
+    maxsize=auth_settings.principal_cache_size,
+    ttl=auth_settings.principal_cache_ttl,
+    name="principal",
+)
+
+
+# Token version cache: user id -> users.token_version, for stateless access tokens.
+token_version_cache = TTLCache(
+    maxsize=auth_settings.principal_cache_size,
+    ttl=auth_settings.token_version_cache_ttl,
+    name="token_version",
+)
+
+
+def normalize_email(email: str) -> str:
+    # emails are stored and looked up trimmed and lower cased
+    return email.strip().lower()
 
 
 class UserRepo:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
     def base_query(self):
         # Base Query for DB calls
-        return self.db.query(User)
+        return select(User)
 
-    def get_user(self, email: EmailStr):
-        # get user by email
-        return self.base_query().filter(User.email.icontains(email)).first()
+    async def get_user(self, email: EmailStr):
+        # get user by email, exact match served by ix_users_email_lower
+        return await self.db.scalar(
+            self.base_query().filter(func.lower(User.email) == normalize_email(email))
+        )
 
-    def create(self, user_create: any) -> User:
+    async def get_user_by_id(self, id: int):
+        # get user by primary key
+        return await self.db.get(User, id)
+
+    async def get_token_version(self, id: int):
+        # token version only, a primary key lookup, None when there is no user
+        return await self.db.scalar(select(User.token_version).filter(User.id == id))
+
+    async def create(self, user_create: any) -> User:
         # create a new user
         new_user = User(**user_create.dict())
+        new_user.email = normalize_email(new_user.email)
         new_user.is_premium = False
         self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
+        await self.db.commit()
+        await self.db.refresh(new_user)
         return new_user
 
-    def delete(self, user: User) -> bool:
+    async def delete(self, user: User) -> bool:
         # delete user
         resp = False
 
-        self.db.delete(user)
-        self.db.commit()
+        await self.db.delete(user)
+        await self.db.commit()
+        principal_cache.pop(user.email)
+        token_version_cache.pop(user.id)
 
-        quick_check = self.base_query().filter(User.email == user.email).first()
+        quick_check = await self.db.scalar(
+            self.base_query().filter(User.email == user.email).limit(1)
+        )
         if not quick_check:
             resp = True
         return resp
 
-    def update(self, user: User):
+    async def update(self, user: User):
         # update user
         updated_user = user
-        self.db.commit()
-        self.db.refresh(updated_user)
+        await self.db.commit()
+        principal_cache.pop(updated_user.email)
+        token_version_cache.pop(updated_user.id)
+        await self.db.refresh(updated_user)
         return updated_user
 
 
 class TokenRepo:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
     def base_query(self):
         # base query for refresh token
-        return self.db.query(RefreshToken)
-
-    def create_token(self, refresh_token: str, user_id: int) -> RefreshToken:
-        # store refresh token
-        refresh_token = RefreshToken(token=refresh_token, user_id=user_id)
+        return select(RefreshToken)
+
+    def expires_at(self):
+        # refresh tokens expire refresh_time_exp minutes from now, database clock
+        return func.now() + timedelta(minutes=auth_settings.refresh_time_exp)
+
+    async def create_token(self, token_hash: bytes, user_id: int) -> RefreshToken:
+        # store a new device/session refresh token. The user's oldest sessions
+        # past max_sessions_per_user are logged out in the same transaction,
+        # so repeated logins cannot grow the table without bound.
+        oldest = (
+            select(RefreshToken.id)
+            .filter(RefreshToken.user_id == user_id)
+            .order_by(RefreshToken.id.desc())
+            .offset(auth_settings.max_sessions_per_user - 1)
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.id.in_(oldest))
+            .execution_options(synchronize_session=False)
+        )
+        refresh_token = RefreshToken(
+            token_hash=token_hash, user_id=user_id, expires_at=self.expires_at()
+        )
         self.db.add(refresh_token)
-        self.db.commit()
-        self.db.refresh(refresh_token)
+        await self.db.commit()
+        await self.db.refresh(refresh_token)
 
         return refresh_token
 
-    def get_token(self, user_id: int):
-        # filter by user_id
-        return self.base_query().filter(RefreshToken.user_id == user_id).first()
-
-    def get_token_by_tok(self, token: str):
-        # filter by token
-        return self.base_query().filter(RefreshToken.token == token).first()
-
-    def update_token(self, update_token) -> RefreshToken:
-        # update token
-        self.db.commit()
-        self.db.refresh(update_token)
-        return update_token
+    async def get_token_by_hash(self, token_hash: bytes):
+        # unexpired token by digest, the owning user is loaded in the same round trip
+        return await self.db.scalar(
+            self.base_query()
+            .options(joinedload(RefreshToken.user))
+            .filter(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.expires_at > func.now(),
+            )
+            .limit(1)
+        )
+
+    async def rotate_token(
+        self, refresh_token: RefreshToken, token_hash: bytes
+    ) -> Optional[int]:
+        # swap the session's token for a new one, only while it still holds the
+        # presented token: of two concurrent refreshes with one token, one wins
+        # and the other gets None back
+        rotated = await self.db.scalar(
+            update(RefreshToken)
+            .where(
+                RefreshToken.id == refresh_token.id,
+                RefreshToken.token_hash == refresh_token.token_hash,
+            )
+            .values(
+                token_hash=token_hash,
+                expires_at=self.expires_at(),
+                date_updated=func.now(),
+            )
+            .returning(RefreshToken.id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return rotated
+
+    async def delete_for_user(self, user_id: int) -> None:
+        # revoke every session of a user, committed by the caller together
+        # with the change that revokes them
+        await self.db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_expired(self, batch_size: int) -> int:
+        # delete expired tokens batch_size rows at a time, short transactions
+        # keep locks and WAL bursts small on a large table
+        deleted = 0
+        while True:
+            expired = (
+                select(RefreshToken.id)
+                .filter(RefreshToken.expires_at <= func.now())
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await self.db.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
 
 
 # Instatiating the Classes.
@@ -5,9 +5,11 @@ from fastapi.security.oauth2 import OAuth2PasswordRequestForm
 # application imports
 from src.auth import schemas
 from src.auth.auth_service import user_service
+from src.auth.models import RefreshToken
 from src.auth.oauth import get_current_user, verify_refresh_token
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.app.utils.db_utils import get_db
+from src.app.utils.response_utils import model_response
 
 # API Router
 user_router = APIRouter(prefix="/api/v1/auth", tags=["User Authentication"])
@@ -18,7 +20,7 @@ user_router = APIRouter(prefix="/api/v1/auth", tags=["User Authentication"])
     status_code=status.HTTP_201_CREATED,
     response_model=schemas.MessageUserResponse,
 )
-async def register(user_create: schemas.user_create, db:Session = Depends(get_db)):
+async def register(user_create: schemas.user_create, db:AsyncSession = Depends(get_db)):
     """Registration of User
 
     Args:
@@ -42,7 +44,7 @@ async def register(user_create: schemas.user_create, db:Session = Depends(get_db
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageLoginResponse,
 )
-def login(login_user: OAuth2PasswordRequestForm = Depends(),db:Session = Depends(get_db)):
+async def login(login_user: OAuth2PasswordRequestForm = Depends(),db:AsyncSession = Depends(get_db)):
     """Login
 
     Args:
@@ -51,14 +53,16 @@ def login(login_user: OAuth2PasswordRequestForm = Depends(),db:Session = Depends
     Returns:
         _type_: user
     """
-    user_login = user_service(db).login(login_user)
-    return user_login
+    user_login = await user_service(db).login(login_user)
+    return model_response(
+        schemas.MessageLoginResponse, user_login, status.HTTP_200_OK
+    )
 
 
 @user_router.get(
     "/me/", status_code=status.HTTP_200_OK, response_model=schemas.MessageUserResponse
 )
-def logged_in_user(current_user: dict = Depends(get_current_user)):
+async def logged_in_user(current_user: dict = Depends(get_current_user),db:AsyncSession = Depends(get_db)):
     """ME
 
     Args:
@@ -67,6 +71,7 @@ def logged_in_user(current_user: dict = Depends(get_current_user)):
     Returns:
         _type_: User
     """
+    current_user = await user_service(db).me(current_user)
     return {"message": "Me Data", "data": current_user, "status": status.HTTP_200_OK}
 
 
@@ -75,8 +80,8 @@ def logged_in_user(current_user: dict = Depends(get_current_user)):
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageUserResponse,
 )
-def update_user(
-    update_user: schemas.UserUpdate, current_user: dict = Depends(get_current_user),db:Session = Depends(get_db)
+async def update_user(
+    update_user: schemas.UserUpdate, current_user: dict = Depends(get_current_user),db:AsyncSession = Depends(get_db)
 ):
     """Update User
 
@@ -87,7 +92,7 @@ def update_user(
     Returns:
         _type_: resp
     """
-    update_user = user_service(db).update_user(update_user, current_user)
+    update_user = await user_service(db).update_user(update_user, current_user)
 
     return {
         "message": "User Updated Successfully",
@@ -97,7 +102,7 @@ def update_user(
 
 
 @user_router.delete("/delete/", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(current_user: dict = Depends(get_current_user),db:Session = Depends(get_db)):
+async def delete_user(current_user: dict = Depends(get_current_user),db:AsyncSession = Depends(get_db)):
     """Delete User
 
     Args:
@@ -106,25 +111,24 @@ def delete_user(current_user: dict = Depends(get_current_user),db:Session = Depe
     Returns:
         _type_: 204
     """
-    user_service(db).delete(current_user)
+    await user_service(db).delete(current_user)
     return {"status": status.HTTP_204_NO_CONTENT}
 
 
 @user_router.get("/refresh/", status_code=status.HTTP_200_OK)
-def get_new_token(new_access_token: str = Depends(verify_refresh_token)):
+async def get_new_token(
+    refresh_token: RefreshToken = Depends(verify_refresh_token),
+    db: AsyncSession = Depends(get_db),
+):
     """New Access token
 
     Args:
-        new_access_token (str, optional): _description_. Defaults to Depends(verify_refresh_token): Gets Access token based on refresh token.
+        refresh_token (RefreshToken, optional): _description_. Defaults to Depends(verify_refresh_token): the session of the presented refresh token.
 
     Returns:
-        _type_: _description_
+        _type_: new access token and the rotated refresh token
     """
-    return {
-        "message": "New access token created successfully",
-        "token": new_access_token,
-        "status": status.HTTP_200_OK,
-    }
+    return await user_service(db).refresh(refresh_token)
 
 
 @user_router.patch(
@@ -132,10 +136,10 @@ def get_new_token(new_access_token: str = Depends(verify_refresh_token)):
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageUserResponse,
 )
-def change_password(
+async def change_password(
     password_data: schemas.ChangePassword,
     current_user: dict = Depends(get_current_user),
-    db:Session = Depends(get_db)    
+    db:AsyncSession = Depends(get_db)    
 ):
     """Change Password
 
@@ -146,12 +150,12 @@ def change_password(
     Returns:
         _type_: response
     """
-    resp = user_service(db).change_password(current_user, password_data)
+    resp = await user_service(db).change_password(current_user, password_data)
     return resp
 
 
 @user_router.post("/password-reset/complete/{token}/", status_code=status.HTTP_200_OK)
-def password_reset_complete(token: str, password_data: schemas.PasswordData,db:Session = Depends(get_db)):
+async def password_reset_complete(token: str, password_data: schemas.PasswordData,db:AsyncSession = Depends(get_db)):
     """Password Reset
 
     Args:
@@ -161,12 +165,12 @@ def password_reset_complete(token: str, password_data: schemas.PasswordData,db:S
     Returns:
         _type_: resp
     """
-    resp = user_service(db).password_reset_complete(token, password_data)
+    resp = await user_service(db).password_reset_complete(token, password_data)
     return resp
 
 
 @user_router.post("/reset-password/", status_code=status.HTTP_200_OK)
-async def reset_password(password_data: schemas.TokenData,db:Session = Depends(get_db)):
+async def reset_password(password_data: schemas.TokenData,db:AsyncSession = Depends(get_db)):
     """Reset Password
 
     Args:
@@ -180,7 +184,7 @@ async def reset_password(password_data: schemas.TokenData,db:Session = Depends(g
 
 
 @user_router.post("/resend-account-verification/", status_code=status.HTTP_200_OK)
-async def resend_account_verification(email_data: schemas.TokenData,db:Session = Depends(get_db)):
+async def resend_account_verification(email_data: schemas.TokenData,db:AsyncSession = Depends(get_db)):
     """Resend Account Verification
 
     Args:
@@ -194,7 +198,7 @@ async def resend_account_verification(email_data: schemas.TokenData,db:Session =
 
 
 @user_router.post("/account-verification/{token}/", status_code=status.HTTP_200_OK)
-async def account_verification(token: str,db:Session = Depends(get_db)):
+async def account_verification(token: str,db:AsyncSession = Depends(get_db)):
     """Account Verification
 
     Args:
@@ -203,5 +207,5 @@ async def account_verification(token: str,db:Session = Depends(get_db)):
     Returns:
         _type_: response
     """
-    resp = user_service(db).account_verification_complete(token)
+    resp = await user_service(db).account_verification_complete(token)
     return resp
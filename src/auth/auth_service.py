@@ -1,19 +1,25 @@
 # Framework Imports
 from fastapi import HTTPException, status
-from fastapi.encoders import jsonable_encoder
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
 
 # application imports
-from src.app.utils.db_utils import hash_password, verify_password
-from src.app.utils.mailer_util import send_mail
-from src.app.utils.token import auth_retrieve_token, auth_settings, auth_token
+from src.app.utils.db_utils import async_hash_password, async_verify_password
+from src.app.celery_jobs import enqueue_mail
+from src.app.utils.token import (
+    auth_retrieve_token,
+    auth_settings,
+    auth_token,
+    token_digest,
+)
 from src.auth import schemas
 from src.auth.auth_repository import token_repo, user_repo
 from src.auth.models import RefreshToken, User
 from src.auth.oauth import (
+    access_token_claims,
     create_access_token,
     create_refresh_token,
     credential_exception,
+    refresh_exception,
 )
 
 
@@ -26,7 +32,7 @@ class UserService:
 
     async def register(self, user: schemas.user_create) -> User:
         # checking if user exists.
-        user_check = self.user_repo.get_user(user.email)
+        user_check = await self.user_repo.get_user(user.email)
 
         # raise an Exception if user exists.
         if user_check:
@@ -35,9 +41,9 @@ class UserService:
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
         # password hashing
-        user.password = hash_password(user.password)
+        user.password = await async_hash_password(user.password)
         # creating new user
-        new_user = self.user_repo.create(user)
+        new_user = await self.user_repo.create(user)
         # create new access token
         token = auth_token(new_user.email)
         # mail data inserted in to the  template
@@ -48,21 +54,21 @@ class UserService:
         # mail title
         mail_title = "Verify your Account"
         template_pointer = "user/verification.html"
-        # send mail
-        await send_mail([new_user.email], mail_title, mail_data, template_pointer)
+        # queue mail
+        await enqueue_mail([new_user.email], mail_title, mail_data, template_pointer)
 
         return new_user
 
-    def login(self, user: OAuth2PasswordRequestForm) -> schemas.LoginResponse:
+    async def login(self, user: OAuth2PasswordRequestForm) -> schemas.LoginResponse:
         # check if user exists.
-        user_check = self.user_repo.get_user(user.username)
+        user_check = await self.user_repo.get_user(user.username)
         # raise exception if there is no user
         if not user_check:
             raise HTTPException(
                 detail="User does not exist", status_code=status.HTTP_400_BAD_REQUEST
             )
         # verify that the password is correct.
-        pass_hash_check = verify_password(user_check.password, user.password)
+        pass_hash_check = await async_verify_password(user_check.password, user.password)
         # raise credential error
         if not pass_hash_check:
             credential_exception()
@@ -74,17 +80,10 @@ class UserService:
             )
         # create Access and Refresh Token
         tokenizer= {"id": user_check.id, "email": user_check.email}
-        access_token = create_access_token(tokenizer)
+        access_token = create_access_token(access_token_claims(user_check))
         refresh_token = create_refresh_token(tokenizer)
-        # check if there is a previously existing refresh token
-        token_check = self.token_repo.get_token(user_check.id)
-        # if token update token column
-        if token_check:
-            token_check.token = refresh_token
-            self.token_repo.update_token(token_check)
-        else:
-            # create new token data
-            self.token_repo.create_token(refresh_token, user_check.id)
+        # a session per login, other devices stay logged in
+        await self.token_repo.create_token(token_digest(refresh_token), user_check.id)
 
         # validating data via the DTO
         refresh_token_ = {"token": refresh_token, "header": "Refresh-Tok"}
@@ -102,22 +101,58 @@ class UserService:
         }
         return resp
 
-    def update_user(self, update_user: schemas.UserUpdate, user: User) -> User:
+    async def refresh(self, refresh_token_check: RefreshToken):
+        # new access token, and the session's refresh token is rotated
+        user = refresh_token_check.user
+        tokenizer = {"id": user.id, "email": user.email}
+        access_token = create_access_token(access_token_claims(user))
+        refresh_token = create_refresh_token(tokenizer)
+        rotated = await self.token_repo.rotate_token(
+            refresh_token_check, token_digest(refresh_token)
+        )
+        # a concurrent refresh with the same token rotated it first
+        if rotated is None:
+            refresh_exception()
+        return {
+            "message": "New access token created successfully",
+            "token": access_token,
+            "refresh_token": {"token": refresh_token, "header": "Refresh-Tok"},
+            "status": status.HTTP_200_OK,
+        }
+
+    async def get_user_instance(self, principal: schemas.Principal) -> User:
+        # load the mutable row behind a cached principal
+        user = await self.user_repo.get_user_by_id(principal.id)
+        if not user:
+            credential_exception()
+        return user
+
+    async def me(self, principal: schemas.Principal):
+        # a stateless principal has no profile fields, load them
+        if principal.date_created is None:
+            return await self.get_user_instance(principal)
+        return principal
+
+    async def update_user(
+        self, update_user: schemas.UserUpdate, principal: schemas.Principal
+    ) -> User:
         # update user
+        user = await self.get_user_instance(principal)
         update_user_dict = update_user.dict(exclude_unset=True)
 
         for key, value in update_user_dict.items():
             setattr(user, key, value)
 
-        return self.user_repo.update(user)
+        return await self.user_repo.update(user)
 
-    def delete(self, user: User) -> bool:
+    async def delete(self, principal: schemas.Principal) -> bool:
         # delete user
-        return self.user_repo.delete(user)
+        user = await self.get_user_instance(principal)
+        return await self.user_repo.delete(user)
 
     async def password_reset(self, user_email: str):
         # check if user exist.
-        user = self.user_repo.get_user(user_email)
+        user = await self.user_repo.get_user(user_email)
         # raise Exception if user does not exist.
         if not user:
             raise HTTPException(
@@ -133,8 +168,8 @@ class UserService:
         # mail subject
         mail_title = "Reset your Password"
         template_pointer = "/user/verification.html"
-        # send mail
-        mail_status = await send_mail(
+        # queue mail
+        mail_status = await enqueue_mail(
             [user.email], mail_title, mail_data, template_pointer
         )
         # response based on the success or failure of sending mail
@@ -151,7 +186,7 @@ class UserService:
                 "mail_status": mail_status,
             }
 
-    def password_reset_complete(self, token: str, password_data: schemas.PasswordData):
+    async def password_reset_complete(self, token: str, password_data: schemas.PasswordData):
         # extract data from timed token
         data = auth_retrieve_token(token)
         # if data is None raise Exception
@@ -161,24 +196,33 @@ class UserService:
             )
         # check for user based on tokjen data
 
-        user = self.user_repo.get_user(data)
+        user = await self.user_repo.get_user(data)
         # raise exception if user does not exist.
         if not user:
             raise HTTPException(
                 detail="User does not exist", status_code=status.HTTP_404_NOT_FOUND
             )
         # update newly set password in hash
-        user.password = hash_password(password_data.password)
+        user.password = await async_hash_password(password_data.password)
+        # revoke stateless access tokens issued before the reset, and every
+        # refresh token session, in the same transaction
+        user.token_version += 1
+        await self.token_repo.delete_for_user(user.id)
         # update user
-        self.user_repo.update(user)
+        await self.user_repo.update(user)
         return {
             "message": "User password set successfully",
             "status": status.HTTP_200_OK,
         }
 
-    def change_password(self, user: User, password_data: schemas.ChangePassword):
+    async def change_password(
+        self, principal: schemas.Principal, password_data: schemas.ChangePassword
+    ):
+        user = await self.get_user_instance(principal)
         # verify oldpassword is saved in the DB
-        password_check = verify_password(user.password, password_data.old_password)
+        password_check = await async_verify_password(
+            user.password, password_data.old_password
+        )
         # if not True raise Exception
         if not password_check:
             raise HTTPException(
@@ -186,9 +230,13 @@ class UserService:
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
         # hash new password
-        user.password = hash_password(password_data.password)
+        user.password = await async_hash_password(password_data.password)
+        # revoke stateless access tokens issued before the change, and every
+        # refresh token session, in the same transaction
+        user.token_version += 1
+        await self.token_repo.delete_for_user(user.id)
         # update user
-        user = self.user_repo.update(user)
+        user = await self.user_repo.update(user)
         # return user
         return {
             "message": "Password changed successfully",
@@ -198,7 +246,7 @@ class UserService:
 
     async def resend_verification_token(self, user_email: str):
         # get user
-        user = self.user_repo.get_user(user_email)
+        user = await self.user_repo.get_user(user_email)
         # if not user raise Exception
         if not user:
             raise HTTPException(
@@ -214,8 +262,8 @@ class UserService:
         # mail subject
         mail_title = "Verify your Account"
         template_pointer = "/user/verification.html"
-        # send email
-        mail_status = await send_mail(
+        # queue email
+        mail_status = await enqueue_mail(
             [user.email], mail_title, mail_data, template_pointer
         )
         # if mail sent send this else
@@ -232,7 +280,7 @@ class UserService:
                 "mail_status": mail_status,
             }
 
-    def account_verification_complete(self, token: str):
+    async def account_verification_complete(self, token: str):
         # validate token
         data = auth_retrieve_token(token)
         # raise token Error if None
@@ -241,7 +289,7 @@ class UserService:
                 detail="Token has expired.", status_code=status.HTTP_409_CONFLICT
             )
         # get user based on the data
-        user = self.user_repo.get_user(data)
+        user = await self.user_repo.get_user(data)
         # if user does not exists raise Exception
         if not user:
             raise HTTPException(
@@ -249,7 +297,7 @@ class UserService:
             )
         # update user verification flag.
         user.is_verified = True
-        self.user_repo.update(user)
+        await self.user_repo.update(user)
         return {
             "message": "User Account is verified successfully",
             "status": status.HTTP_200_OK,
@@ -1,5 +1,16 @@
 # 3rd party imports
-from sqlalchemy import Boolean, Column, ForeignKey, String, text
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    func,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 # application imports
@@ -15,11 +26,23 @@ class User(AbstractModel):
     password = Column(String, nullable=False)
     is_verified = Column(Boolean, nullable=False, server_default=text("false"))
     is_premium = Column(Boolean, nullable=False, server_default=text("false"))
+    # orgs created by the user, kept in step by OrgRepo.create_org/delete_org
+    owned_org_count = Column(Integer, nullable=False, server_default=text("0"))
+    # bumped to revoke every stateless access token issued to the user
+    token_version = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
 
 
 class RefreshToken(AbstractModel):
-    # Refresh Token Table
+    # Refresh Token Table, one row per logged in device/session
     __tablename__ = "user_refresh_token"
-    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String, nullable=False)
+    user_id = Column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # sha256 digest of the refresh JWT, the token itself is never stored
+    token_hash = Column(LargeBinary(32), nullable=False, unique=True, index=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     user = relationship("User", passive_deletes=True)
@@ -1,19 +1,31 @@
 # python import
+import secrets
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 
 # framework imports
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security.oauth2 import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # JWT imports
 from jose import JWTError, jwt
 
 # Apoplication imports
 from src.app.config import auth_settings
+from src.app.utils.cache import TTLCache
 from src.app.utils.db_utils import get_db
-from src.auth.auth_repository import token_repo, user_repo
-from src.auth.schemas import TokenData
+from src.app.utils.timing_utils import timed
+from src.app.utils.token import token_digest
+from src.auth.auth_repository import (
+    principal_cache,
+    token_repo,
+    token_version_cache,
+    user_repo,
+)
+from src.auth.models import RefreshToken, User
+from src.auth.schemas import Principal, TokenData
 
 # OAUTH Login Endpoint
 oauth_schemes = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login/")
@@ -26,6 +38,26 @@ access_time_exp = auth_settings.access_time_exp
 refresh_time_exp = auth_settings.refresh_time_exp
 Algorithm = auth_settings.algorithm
 
+# Verified access token claims by token digest, an entry lives until the
+# token's exp so the signature is checked once per token instead of once per
+# request. Refresh tokens are single use since rotation and are not cached.
+access_claims_cache = TTLCache(
+    maxsize=auth_settings.jwt_cache_size,
+    ttl=access_time_exp * 60,
+    name="jwt_access",
+)
+
+
+def access_token_claims(user: User) -> dict:
+    # claims of a user's access token, stateless tokens also carry what the
+    # routes need plus the token version they were issued under
+    claims = {"id": user.id, "email": user.email}
+    if auth_settings.stateless_access_tokens:
+        claims["is_verified"] = user.is_verified
+        claims["is_premium"] = user.is_premium
+        claims["ver"] = user.token_version
+    return claims
+
 
 def create_access_token(data: dict) -> str:
     # Create Access Token
@@ -41,10 +73,43 @@ def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now() + timedelta(minutes=refresh_time_exp)
     to_encode["exp"] = expire
+    # unique per issue, two logins in the same second get different tokens
+    to_encode["jti"] = secrets.token_urlsafe(16)
     refresh_encode_jwt = jwt.encode(to_encode, refresh_secret_key, algorithm=Algorithm)
     return refresh_encode_jwt
 
 
+def decode_token(
+    token: str, secret_key: str, cache: Optional[TTLCache] = None
+) -> dict:
+    """Decode Token
+
+    Args:
+        token (str): JWT.
+        secret_key (str): key the token was signed with.
+        cache (Optional[TTLCache]): verified claims cache for that key, None
+            for single use tokens.
+
+    Raises:
+        JWTError: invalid signature or expired token, never cached.
+
+    Returns:
+        dict: claims, shared with the cache so they must not be mutated.
+    """
+    if cache is None:
+        with timed("jwt"):
+            return jwt.decode(token, secret_key, algorithms=Algorithm)
+    key = token_digest(token)
+    claims = cache.get(key)
+    if claims is None:
+        with timed("jwt"):
+            claims = jwt.decode(token, secret_key, algorithms=Algorithm)
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            cache.set(key, claims, ttl)
+    return claims
+
+
 def credential_exception():
     # Throw Auth Exception
     raise HTTPException(
@@ -64,10 +129,12 @@ def refresh_exception():
     )
 
 
-def verify_refresh_token(refresh_tok: str = Header(),db:Session = Depends(get_db)) -> str:
+async def verify_refresh_token(
+    refresh_tok: str = Header(), db: AsyncSession = Depends(get_db)
+) -> RefreshToken:
     # Verify Refresh Token
     try:
-        decoded_data = jwt.decode(refresh_tok, refresh_secret_key, algorithms=Algorithm)
+        decoded_data = decode_token(refresh_tok, refresh_secret_key)
         email = decoded_data.get("email")
         if not email:
             raise refresh_exception()
@@ -75,7 +142,10 @@ def verify_refresh_token(refresh_tok: str = Header(),db:Session = Depends(get_db
     except JWTError:
         raise refresh_exception()
 
-    refresh_token_check = token_repo(db).get_token_by_tok(refresh_tok)
+    # constant cost lookup on the digest's unique index
+    refresh_token_check = await token_repo(db).get_token_by_hash(
+        token_digest(refresh_tok)
+    )
 
     if not refresh_token_check:
         refresh_exception()
@@ -83,13 +153,44 @@ def verify_refresh_token(refresh_tok: str = Header(),db:Session = Depends(get_db
     if refresh_token_check.user.email != token_data.email:
         refresh_exception()
 
-    return create_access_token(decoded_data)
+    return refresh_token_check
+
+
+async def stateless_principal(claims: dict, db: AsyncSession) -> Principal:
+    """Stateless Principal
 
+    Args:
+        claims (dict): verified claims of a stateless access token.
+        db (AsyncSession): only used when the user's token version is not cached.
 
-def get_current_user(token: str = Depends(oauth_schemes), db:Session = Depends(get_db)):
-    # Verify Access token and return User
+    Returns:
+        Principal: principal built from the claims, profile fields are None.
+    """
+    user_id = claims["id"]
+    # revocation check, the version is cached for token_version_cache_ttl seconds
+    token_version = token_version_cache.get(user_id)
+    if token_version is None:
+        token_version = await user_repo(db).get_token_version(user_id)
+        if token_version is None:
+            credential_exception()
+        token_version_cache.set(user_id, token_version)
+    if claims["ver"] != token_version:
+        credential_exception()
+
+    return Principal.construct(
+        id=user_id,
+        email=claims["email"],
+        is_verified=claims["is_verified"],
+        is_premium=claims["is_premium"],
+    )
+
+
+async def get_current_user(
+    token: str = Depends(oauth_schemes), db: AsyncSession = Depends(get_db)
+) -> Principal:
+    # Verify Access token and return a snapshot of the User
     try:
-        decode_data = jwt.decode(token, access_secret_key, algorithms=Algorithm)
+        decode_data = decode_token(token, access_secret_key, access_claims_cache)
         email = decode_data.get("email")
         if email is None:
             credential_exception()
@@ -98,9 +199,18 @@ def get_current_user(token: str = Depends(oauth_schemes), db:Session = Depends(g
     except JWTError:
         credential_exception()
 
-    user_check = user_repo(db).get_user(token_data.email)
+    if auth_settings.stateless_access_tokens and "ver" in decode_data:
+        return await stateless_principal(decode_data, db)
+
+    principal = principal_cache.get(token_data.email)
+    if principal is not None:
+        return principal
+
+    user_check = await user_repo(db).get_user(token_data.email)
 
     if not user_check:
         credential_exception()
 
-    return user_check
+    principal = Principal.from_orm(user_check)
+    principal_cache.set(user_check.email, principal)
+    return principal
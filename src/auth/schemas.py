@@ -14,6 +14,21 @@ class TokenData(AbstractModel):
     email: EmailStr
 
 
+# Logged in user snapshot (cached between requests), a stateless access
+# token only carries id, email, is_verified and is_premium
+class Principal(AbstractModel):
+    id: int
+    first_name: Optional[str]
+    last_name: Optional[str]
+    email: EmailStr
+    is_verified: bool
+    is_premium: bool
+    date_created: Optional[datetime]
+
+    class Config:
+        frozen = True
+
+
 # Create new user
 class user_create(AbstractModel):
     first_name: str
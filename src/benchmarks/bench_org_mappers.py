@@ -0,0 +1,92 @@
+"""Org Mapper Benchmark
+
+Per member cost of turning a page of loaded OrgMember rows into the
+MessageListOrgMemResp body, the jsonable_encoder mapping the service used
+before against the row to DTO mappers.
+
+    python -m src.benchmarks.bench_org_mappers --members 10000
+"""
+# python imports
+import argparse
+import time
+from typing import Callable, List
+
+# 3rd party imports
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+# application imports
+from src.app.utils.response_utils import model_response
+from src.auth.models import User
+from src.organization import schemas
+from src.organization.mappers import org_member_response_dto
+from src.organization.models import Organization, OrgMember
+
+
+def build_members(count: int) -> List[OrgMember]:
+    # transient rows shaped like org_member_repo.loaded_query results
+    org = Organization(id=1, name="Bench Org", slug="bench-org", revoke_link=False)
+    org_members = []
+    for i in range(count):
+        user = User(
+            id=i,
+            first_name=f"first{i}",
+            last_name=f"last{i}",
+            email=f"user{i}@example.com",
+            is_verified=True,
+            is_premium=False,
+        )
+        org_members.append(
+            OrgMember(
+                id=i, org_id=org.id, member_id=i, role="Member", member=user, org=org
+            )
+        )
+    return org_members
+
+
+def legacy_body(org_members: List[OrgMember]) -> bytes:
+    # jsonable_encoder per member, then FastAPI's response_model validation and encoding
+    data = []
+    for org_member in org_members:
+        org_member_ = jsonable_encoder(org_member)
+        org_member_["org"] = org_member.org
+        org_member_["user"] = org_member.member
+        data.append(org_member_)
+    resp = {"message": "ok", "data": data, "next_cursor": None, "status": 200}
+    content = schemas.MessageListOrgMemResp.parse_obj(resp)
+    return orjson.dumps(jsonable_encoder(content))
+
+
+def mapper_body(org_members: List[OrgMember]) -> bytes:
+    # typed DTOs, validated once and dumped once
+    data = [org_member_response_dto(org_member) for org_member in org_members]
+    resp = {"message": "ok", "data": data, "next_cursor": None, "status": 200}
+    return model_response(schemas.MessageListOrgMemResp, resp, 200).body
+
+
+def best_of(func: Callable, org_members: List[OrgMember], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(org_members)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    org_members = build_members(args.members)
+    for name, func in (("jsonable_encoder", legacy_body), ("dto mappers", mapper_body)):
+        total = best_of(func, org_members, args.repeat)
+        print(
+            f"{name:<18} {total * 1000:9.2f} ms total"
+            f" {total / args.members * 1e6:8.2f} us/member"
+        )
+
+
+if __name__ == "__main__":
+    main()
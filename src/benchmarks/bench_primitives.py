@@ -0,0 +1,263 @@
+"""Primitive Microbenchmarks
+
+Per call cost of the CPU hot spots that can be measured without a database:
+JWT signing and verification, itsdangerous invite tokens, bcrypt, the org
+DTO mappers and MessageListOrgResp validation of an org with --members members.
+
+    python -m src.benchmarks.bench_primitives --history bench-results/primitives.jsonl
+
+Each run records the best per call time of every benchmark together with the
+commit and the versions of the libraries doing the work. With --history the run
+is compared against the latest recorded time of each benchmark (or --baseline)
+and the command exits 1 when a benchmark got slower than --max-regression
+percent, so a code or dependency change that slows a primitive shows up as a
+failed run. Only passing runs are appended to the history, a regression keeps
+failing until it is fixed or deliberately accepted with --accept.
+"""
+# python imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 3rd party imports
+import orjson
+
+# application imports
+from src.app.utils.db_utils import hash_password, verify_password
+from src.app.utils.response_utils import model_response
+from src.app.utils.token import (
+    auth_retrieve_token,
+    auth_token,
+    gen_token,
+    retrieve_token,
+)
+from src.auth.oauth import Algorithm, access_secret_key, create_access_token, jwt
+from src.benchmarks.bench_org_mappers import build_members
+from src.organization import schemas
+from src.organization.org_service import OrgService
+
+# libraries whose upgrades move these numbers
+PACKAGES = (
+    "python-jose",
+    "itsdangerous",
+    "passlib",
+    "bcrypt",
+    "pydantic",
+    "orjson",
+    "SQLAlchemy",
+)
+
+
+def build_org(members: int):
+    # transient org with creator and members loaded, as org_repo.loaded_query
+    org_members = build_members(members)
+    org = org_members[0].org
+    org.creator = org_members[0].member
+    org.org_member = org_members
+    return org
+
+
+def benchmarks(members: int) -> Dict[str, Callable[[], object]]:
+    """Benchmarks
+
+    Args:
+        members (int): members of the org used by the mapper and schema benchmarks.
+
+    Returns:
+        Dict[str, Callable[[], object]]: name -> zero argument callable to time.
+    """
+    claims = {"id": 1, "email": "bench@example.com"}
+    access_token = create_access_token(claims)
+    invite_token = gen_token("bench-org")
+    timed_invite_token = auth_token("bench@example.com")
+    password_hash = hash_password("bench-password")
+
+    org = build_org(members)
+    org_service = OrgService(None)
+    list_resp = {
+        "message": "ok",
+        "data": [org_service.orm_call(org)],
+        "next_cursor": None,
+        "total": 1,
+        "status": 200,
+    }
+    # the response body as plain dicts, what response_model validation sees
+    list_payload = orjson.loads(
+        model_response(schemas.MessageListOrgResp, list_resp, 200).body
+    )
+
+    return {
+        "create_access_token": lambda: create_access_token(claims),
+        "jwt.decode": lambda: jwt.decode(
+            access_token, access_secret_key, algorithms=Algorithm
+        ),
+        "gen_token": lambda: gen_token("bench-org"),
+        "retrieve_token": lambda: retrieve_token(invite_token),
+        "auth_retrieve_token": lambda: auth_retrieve_token(timed_invite_token),
+        "hash_password": lambda: hash_password("bench-password"),
+        "verify_password": lambda: verify_password(password_hash, "bench-password"),
+        "orm_call": lambda: org_service.orm_call(org),
+        "member_orm_call": lambda: org_service.member_orm_call(org.org_member[0]),
+        "MessageListOrgResp.parse_obj": lambda: schemas.MessageListOrgResp.parse_obj(
+            list_payload
+        ),
+        "model_response MessageListOrgResp": lambda: model_response(
+            schemas.MessageListOrgResp, list_resp, 200
+        ),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> float:
+    # best per call seconds, calls per sample sized so a sample lasts min_time
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def environment() -> dict:
+    packages = {}
+    for package in PACKAGES:
+        try:
+            packages[package] = version(package)
+        except PackageNotFoundError:
+            packages[package] = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "packages": packages,
+    }
+
+
+def history_baseline(history: Path, members: int) -> Optional[dict]:
+    # latest recorded time of every benchmark in a JSON lines history file,
+    # runs with another --members are not comparable and skipped
+    if not history.exists():
+        return None
+    baseline = None
+    for line in history.read_text().splitlines():
+        run = json.loads(line)
+        if run.get("args", {}).get("members") != members:
+            continue
+        results = {**(baseline or {}).get("results", {}), **run["results"]}
+        baseline = {**run, "results": results}
+    return baseline
+
+
+def compare(
+    result: dict, baseline: Optional[dict], max_regression: float
+) -> List[Tuple[str, float]]:
+    """Compare
+
+    Args:
+        result (dict): this run.
+        baseline (Optional[dict]): run to compare against.
+        max_regression (float): allowed slowdown in percent.
+
+    Returns:
+        List[Tuple[str, float]]: benchmarks slower than allowed, with the slowdown.
+    """
+    print(f"{'benchmark':<36}{'per call':>14}{'vs baseline':>14}")
+    regressions = []
+    before = (baseline or {}).get("results", {})
+    for name, seconds in result["results"].items():
+        line = f"{name:<36}{seconds * 1e6:>11.2f} us"
+        if before.get(name):
+            change = (seconds - before[name]) / before[name] * 100
+            line += f"{change:>+13.1f}%"
+            if change > max_regression:
+                regressions.append((name, change))
+        print(line)
+
+    if baseline:
+        print(f"baseline: {baseline.get('commit')} from {baseline.get('date')}")
+        for package, current in result["packages"].items():
+            previous = baseline.get("packages", {}).get(package)
+            if previous != current:
+                print(f"  {package} changed {previous} -> {current}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timing sample"
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--history", type=Path, help="JSON lines file runs append to")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="run to compare against, the history's latest times by default",
+    )
+    parser.add_argument(
+        "--accept",
+        action="store_true",
+        help="record this run in the history even if it regressed",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=15,
+        help="exit 1 when a benchmark is this many percent slower than the baseline",
+    )
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+    elif args.history:
+        baseline = history_baseline(args.history, args.members)
+
+    result = environment()
+    result["args"] = {"members": args.members, "repeat": args.repeat}
+    result["results"] = {
+        name: measure(func, args.repeat, args.min_time)
+        for name, func in benchmarks(args.members).items()
+        if args.filter in name
+    }
+    if baseline and baseline.get("args", {}).get("members") != args.members:
+        print("baseline ran with a different --members, not comparing")
+        baseline = None
+
+    regressions = compare(result, baseline, args.max_regression)
+    # a regressed run never becomes the baseline unless accepted, or a
+    # slowdown would fail once and pass from the next run on
+    if args.history and (args.accept or not regressions):
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with args.history.open("a") as history:
+            history.write(json.dumps(result) + "\n")
+    if regressions:
+        print(
+            "slower than baseline: "
+            + ", ".join(f"{name} {change:+.1f}%" for name, change in regressions)
+        )
+        if args.history and not args.accept:
+            print("not recorded in the history, rerun with --accept to keep it")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Load Test Runner
+
+Drives a mix of auth and org traffic against a running server, seeded by
+src.benchmarks.load.seed, and reports throughput and p50/p95/p99 latency per
+scenario. Results are saved as JSON and can be compared against a baseline.
+
+    python -m src.benchmarks.load.run --mix login=1,me=10,members=4,join=1 \\
+        --duration 60 --concurrency 64 --out bench-results/run.json \\
+        --baseline bench-results/baseline.json
+
+Scenarios:
+    login    login storm, bcrypt verify plus a refresh token insert
+    me       get_current_user heavy read of /auth/me/
+    members  first page of /org/{slug}/members/ on the largest orgs
+    join     invite link join of a user that belongs to no org yet
+
+Joins use up the seeded join users, a second run against the same seed gets
+409s for them and is not comparable with its baseline. Reseed before every run
+that includes join: python -m src.benchmarks.load.seed --reset ...
+"""
+# python imports
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 3rd party imports
+import httpx
+
+# application imports
+from src.app.utils.token import gen_token
+from src.app.utils.schemas_utils import RoleOptions
+from src.auth.oauth import access_token_claims, create_access_token
+
+SCENARIOS = ("login", "me", "members", "join")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    # nearest rank percentile of sorted values
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}, pick from {SCENARIOS}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class SeededUser:
+    # stand in for a seeded users row, enough for access_token_claims
+    def __init__(self, id: int, email: str) -> None:
+        self.id = id
+        self.email = email
+        self.is_verified = True
+        self.is_premium = False
+        self.token_version = 0
+
+
+class LoadRun:
+    """Load Run
+
+    Args:
+        client (httpx.AsyncClient): client bound to the server under test.
+        manifest (dict): seed manifest.
+        args (argparse.Namespace): runner options.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, manifest: dict, args) -> None:
+        self.client = client
+        self.manifest = manifest
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.weights = parse_mix(args.mix)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.weights}
+        self.statuses: Dict[str, Dict[int, int]] = {name: {} for name in self.weights}
+        self.errors: Dict[str, int] = {name: 0 for name in self.weights}
+        # join picks taken after the join users ran out
+        self.join_misses = 0
+        self.join_users = list(manifest["join_users"])
+        self.measure_from = 0.0
+
+        # access tokens are minted with the app's settings instead of logging in
+        # every virtual user first, so setup does not turn into a login storm
+        self.users = manifest["users"]
+        self.tokens: Dict[int, str] = {}
+        largest = sorted(manifest["orgs"], key=lambda org: org["members"], reverse=True)
+        self.large_orgs = largest[: args.large_orgs]
+
+    def headers(self, user_id: int, email: str) -> dict:
+        token = self.tokens.get(user_id)
+        if token is None:
+            claims = access_token_claims(SeededUser(user_id, email))
+            token = self.tokens[user_id] = create_access_token(claims)
+        return {"Authorization": f"Bearer {token}"}
+
+    async def login(self) -> httpx.Response:
+        _, email = self.rng.choice(self.users)
+        return await self.client.post(
+            "/api/v1/auth/login/",
+            data={"username": email, "password": self.manifest["password"]},
+        )
+
+    async def me(self) -> httpx.Response:
+        user_id, email = self.rng.choice(self.users)
+        return await self.client.get(
+            "/api/v1/auth/me/", headers=self.headers(user_id, email)
+        )
+
+    async def members(self) -> httpx.Response:
+        org = self.rng.choice(self.large_orgs)
+        return await self.client.get(
+            f"/api/v1/org/{org['slug']}/members/",
+            headers=self.headers(org["admin_id"], org["admin_email"]),
+        )
+
+    async def join(self) -> Optional[httpx.Response]:
+        if not self.join_users:
+            return None
+        org = self.rng.choice(self.manifest["orgs"])
+        return await self.client.post(
+            "/api/v1/org/join/",
+            params={
+                "token": gen_token(org["slug"]),
+                "role_token": gen_token(RoleOptions.member.value),
+            },
+            json={"email": self.join_users.pop()},
+        )
+
+    async def worker(self, deadline: float) -> None:
+        while self.weights and time.perf_counter() < deadline:
+            name = self.rng.choices(list(self.weights), list(self.weights.values()))[0]
+            start = time.perf_counter()
+            # requests started during the warmup are not recorded
+            recording = start >= self.measure_from
+            try:
+                response = await getattr(self, name)()
+            except httpx.HTTPError:
+                if recording:
+                    self.errors[name] += 1
+                continue
+            if response is None:
+                # join users ran out: stop picking join and yield, a loop that
+                # never awaits would starve the other workers
+                self.weights.pop(name, None)
+                self.join_misses += 1
+                await asyncio.sleep(0)
+                continue
+            elapsed = time.perf_counter() - start
+            if not recording:
+                continue
+            self.latencies[name].append(elapsed)
+            statuses = self.statuses[name]
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                self.errors[name] += 1
+
+    async def run(self) -> float:
+        self.measure_from = time.perf_counter() + self.args.warmup
+        deadline = self.measure_from + self.args.duration
+        await asyncio.gather(
+            *(self.worker(deadline) for _ in range(self.args.concurrency))
+        )
+        return time.perf_counter() - self.measure_from
+
+    def summary(self, elapsed: float) -> dict:
+        scenarios = {}
+        for name, latencies in self.latencies.items():
+            latencies.sort()
+            scenarios[name] = {
+                "requests": len(latencies),
+                "errors": self.errors[name],
+                "statuses": {str(k): v for k, v in sorted(self.statuses[name].items())},
+                "rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            }
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "total_rps": round(total / elapsed, 2),
+            "elapsed_s": round(elapsed, 2),
+            "join_misses": self.join_misses,
+            "scenarios": scenarios,
+        }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict, baseline: Optional[dict]) -> List[str]:
+    """Print Report
+
+    Args:
+        result (dict): this run.
+        baseline (Optional[dict]): run to compare against.
+
+    Returns:
+        List[str]: scenarios whose p95 regressed past --max-regression.
+    """
+    print(
+        f"{'scenario':<10}{'requests':>10}{'errors':>8}{'rps':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    regressions = []
+    for name, stats in result["scenarios"].items():
+        print(
+            f"{name:<10}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+        before = (baseline or {}).get("scenarios", {}).get(name)
+        if before and before["p95_ms"]:
+            change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            rps_change = (stats["rps"] - before["rps"]) / (before["rps"] or 1) * 100
+            print(f"{'':<10}vs baseline: p95 {change:+.1f}%, rps {rps_change:+.1f}%")
+            if change > result["args"]["max_regression"]:
+                regressions.append(name)
+    print(f"total {result['total_rps']} req/s over {result['elapsed_s']}s")
+    if result["join_misses"]:
+        print(
+            "join users ran out, join was dropped from the mix: seed more --join-users"
+        )
+    return regressions
+
+
+async def main_async(args) -> dict:
+    manifest = json.loads(args.manifest.read_text())
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        load = LoadRun(client, manifest, args)
+        elapsed = await load.run()
+    result = load.summary(elapsed)
+    result["date"] = datetime.now(timezone.utc).isoformat()
+    result["commit"] = git_commit()
+    result["args"] = {
+        key: str(value) if isinstance(value, Path) else value
+        for key, value in vars(args).items()
+    }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--manifest", type=Path, default=Path("bench-results/seed.json")
+    )
+    parser.add_argument("--mix", default="login=1,me=10,members=4,join=1")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--large-orgs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10,
+        help="exit 1 when a scenario's p95 is this many percent above the baseline",
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    baseline = None
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    regressions = print_report(result, baseline)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, indent=2))
+    if regressions:
+        print(f"p95 regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
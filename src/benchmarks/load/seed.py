@@ -0,0 +1,178 @@
+"""Load Test Seeder
+
+Fills the database the app points at with N users, M orgs and a member
+distribution, then writes a manifest the load runner reads.
+
+    python -m src.benchmarks.load.seed --users 10000 --orgs 200 --max-members 5000
+
+Org i gets max_members / (i + 1) ** skew members (at least one, its admin), so
+skew 0 gives equal orgs and skew 1 a long tail behind a few large orgs. The last
+join_users users belong to no org and are kept for the invite join traffic.
+"""
+# python imports
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# 3rd party imports
+from sqlalchemy import insert, text
+
+# application imports
+from src.app.database import engine
+from src.app.utils.db_utils import hash_password
+from src.app.utils.schemas_utils import RoleOptions
+from src.auth.models import User
+from src.organization.models import Organization, OrgMember
+
+BATCH_SIZE = 5000
+
+
+def org_sizes(orgs: int, max_members: int, skew: float, users: int) -> List[int]:
+    # members per org, capped by the users available
+    return [min(users, max(1, int(max_members / (i + 1) ** skew))) for i in range(orgs)]
+
+
+def insert_returning(conn, table, rows: List[Dict], *columns) -> List:
+    # batched insert, ids come back through RETURNING
+    result = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start : start + BATCH_SIZE]
+        result += conn.execute(insert(table).returning(*columns), batch).all()
+    return result
+
+
+def seed(args) -> dict:
+    rng = random.Random(args.seed)
+    # one bcrypt hash shared by every user, hashing N passwords is not the point
+    password_hash = hash_password(args.password)
+    member_users = args.users - args.join_users
+    if member_users < 1:
+        raise SystemExit("--join-users must leave at least one user for the orgs")
+
+    with engine.begin() as conn:
+        if args.reset:
+            conn.execute(
+                text(
+                    "TRUNCATE users, organization, organization_member, "
+                    "user_refresh_token RESTART IDENTITY CASCADE"
+                )
+            )
+
+        users = insert_returning(
+            conn,
+            User,
+            [
+                {
+                    "first_name": f"Bench{i}",
+                    "last_name": "User",
+                    "email": f"bench{i}@example.com",
+                    "password": password_hash,
+                    "is_verified": True,
+                    "is_premium": False,
+                }
+                for i in range(args.users)
+            ],
+            User.id,
+            User.email,
+        )
+        candidates = [user.id for user in users[:member_users]]
+
+        sizes = org_sizes(args.orgs, args.max_members, args.skew, member_users)
+        admins = [rng.choice(candidates) for _ in sizes]
+        orgs = insert_returning(
+            conn,
+            Organization,
+            [
+                {
+                    "name": f"Bench Org {i}",
+                    "slug": f"bench-org-{i}",
+                    "created_by": admin,
+                }
+                for i, admin in enumerate(admins)
+            ],
+            Organization.id,
+            Organization.slug,
+        )
+
+        memberships = []
+        for org, admin, size in zip(orgs, admins, sizes):
+            memberships.append(
+                {"org_id": org.id, "member_id": admin, "role": RoleOptions.admin.value}
+            )
+            others = rng.sample(candidates, min(size, len(candidates)))
+            memberships += [
+                {
+                    "org_id": org.id,
+                    "member_id": user_id,
+                    "role": RoleOptions.member.value,
+                }
+                for user_id in others
+                if user_id != admin
+            ][: size - 1]
+        for start in range(0, len(memberships), BATCH_SIZE):
+            conn.execute(insert(OrgMember), memberships[start : start + BATCH_SIZE])
+
+        conn.execute(
+            text(
+                "UPDATE users SET owned_org_count = owned.n FROM ("
+                "SELECT created_by, count(*) AS n FROM organization GROUP BY created_by"
+                ") AS owned WHERE users.id = owned.created_by"
+            )
+        )
+        conn.execute(text("ANALYZE"))
+
+    emails = {user.id: user.email for user in users}
+    member_count = {}
+    for membership in memberships:
+        member_count[membership["org_id"]] = (
+            member_count.get(membership["org_id"], 0) + 1
+        )
+    return {
+        "password": args.password,
+        "users": [[user.id, user.email] for user in users[:member_users]],
+        "join_users": [user.email for user in users[member_users:]],
+        "orgs": [
+            {
+                "slug": org.slug,
+                "admin_id": admin,
+                "admin_email": emails[admin],
+                "members": member_count[org.id],
+            }
+            for org, admin in zip(orgs, admins)
+        ],
+        "memberships": len(memberships),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--orgs", type=int, default=200)
+    parser.add_argument("--max-members", type=int, default=5000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--join-users", type=int, default=2000)
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--reset", action="store_true", help="truncate the tables first"
+    )
+    parser.add_argument(
+        "--manifest", type=Path, default=Path("bench-results/seed.json")
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = seed(args)
+    args.manifest.parent.mkdir(parents=True, exist_ok=True)
+    args.manifest.write_text(json.dumps(manifest))
+    print(
+        f"seeded {args.users} users, {args.orgs} orgs, {manifest['memberships']}"
+        f" memberships in {time.perf_counter() - start:.1f}s -> {args.manifest}"
+    )
+
+
+if __name__ == "__main__":
+    main()
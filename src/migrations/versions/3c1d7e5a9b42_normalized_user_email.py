@@ -0,0 +1,64 @@
+"""Normalized User Email
+
+Revision ID: 3c1d7e5a9b42
+Revises: 80f9e1cc8879
+Create Date: 2026-10-18 09:12:44.218306
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c1d7e5a9b42"
+down_revision = "80f9e1cc8879"
+branch_labels = None
+depends_on = None
+
+
+# rows normalized per backfill transaction
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # accounts that only differ by case or surrounding spaces would collide on
+    # the existing unique(email) constraint halfway through the backfill, so
+    # they are reported up front and have to be merged by hand first.
+    duplicates = bind.execute(
+        sa.text(
+            "SELECT lower(trim(email)) AS email, array_agg(id ORDER BY id) AS ids "
+            "FROM users GROUP BY lower(trim(email)) HAVING count(*) > 1 "
+            "ORDER BY 1 LIMIT 50"
+        )
+    ).all()
+    if duplicates:
+        raise RuntimeError(
+            "users with emails that only differ by case or spaces, resolve "
+            "them before upgrading:\n"
+            + "\n".join(f"  {row.email}: ids {row.ids}" for row in duplicates)
+        )
+
+    # backfill: store every email trimmed and lower cased.
+    backfill = sa.text(
+        "UPDATE users SET email = lower(trim(email)) "
+        "WHERE id IN (SELECT id FROM users "
+        "WHERE email <> lower(trim(email)) LIMIT :batch_size)"
+    ).bindparams(batch_size=BATCH_SIZE)
+
+    # batches commit one by one and the index is built concurrently, the
+    # table is never locked for the length of a full pass.
+    with op.get_context().autocommit_block():
+        while bind.execute(backfill).rowcount:
+            pass
+        op.create_index(
+            "ix_users_email_lower",
+            "users",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
+    pass
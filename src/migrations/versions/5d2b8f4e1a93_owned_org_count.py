@@ -0,0 +1,37 @@
+"""Owned Org Count
+
+Revision ID: 5d2b8f4e1a93
+Revises: a7e24f0c6d18
+Create Date: 2026-10-18 14:37:05.118942
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d2b8f4e1a93"
+down_revision = "a7e24f0c6d18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "owned_org_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    # backfill: orgs each user has created so far.
+    op.execute(
+        sa.text(
+            "UPDATE users SET owned_org_count = ("
+            "SELECT count(*) FROM organization WHERE organization.created_by = users.id)"
+        )
+    )
+    pass
+
+
+def downgrade() -> None:
+    op.drop_column("users", "owned_org_count")
+    pass
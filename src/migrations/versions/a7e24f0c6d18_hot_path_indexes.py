@@ -0,0 +1,54 @@
+"""Hot Path Indexes
+
+Revision ID: a7e24f0c6d18
+Revises: 3c1d7e5a9b42
+Create Date: 2026-10-18 10:03:27.551940
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a7e24f0c6d18"
+down_revision = "3c1d7e5a9b42"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, unique)
+indexes = [
+    ("ix_organization_slug", "organization", ["slug"], True),
+    ("ix_organization_created_by", "organization", ["created_by"], False),
+    (
+        "ix_organization_member_org_id_member_id",
+        "organization_member",
+        ["org_id", "member_id"],
+        True,
+    ),
+    ("ix_organization_member_member_id", "organization_member", ["member_id"], False),
+    ("ix_user_refresh_token_token", "user_refresh_token", ["token"], False),
+    ("ix_user_refresh_token_user_id", "user_refresh_token", ["user_id"], False),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in indexes:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+            )
+    pass
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(indexes):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+            )
+    pass
@@ -0,0 +1,100 @@
+"""Hashed Refresh Tokens
+
+Revision ID: c94a07d3e215
+Revises: e81f4c2a6b07
+Create Date: 2026-10-18 16:02:11.730452
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from src.app.config import auth_settings
+
+# revision identifiers, used by Alembic.
+revision = "c94a07d3e215"
+down_revision = "e81f4c2a6b07"
+branch_labels = None
+depends_on = None
+
+
+# rows digested per backfill transaction
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_refresh_token", sa.Column("token_hash", sa.LargeBinary(32), nullable=True)
+    )
+    op.add_column(
+        "user_refresh_token",
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    # backfill: digest the stored tokens, existing sessions get a full refresh window.
+    backfill = sa.text(
+        "UPDATE user_refresh_token SET token_hash = sha256(convert_to(token, 'UTF8')), "
+        "expires_at = now() + make_interval(mins => :minutes) "
+        "WHERE id IN (SELECT id FROM user_refresh_token "
+        "WHERE token_hash IS NULL LIMIT :batch_size)"
+    ).bindparams(minutes=auth_settings.refresh_time_exp, batch_size=BATCH_SIZE)
+
+    # batches commit one by one and the indexes are built concurrently, the
+    # table is never locked for the length of a full pass.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while bind.execute(backfill).rowcount:
+            pass
+        op.create_index(
+            "ix_user_refresh_token_token_hash",
+            "user_refresh_token",
+            ["token_hash"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_refresh_token_expires_at",
+            "user_refresh_token",
+            ["expires_at"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_user_refresh_token_token",
+            table_name="user_refresh_token",
+            postgresql_concurrently=True,
+        )
+        # sessions created while the indexes were built
+        while bind.execute(backfill).rowcount:
+            pass
+        # a validated check constraint lets SET NOT NULL below skip its scan
+        # under the exclusive lock, VALIDATE runs on its own and only takes a
+        # lock that allows reads and writes.
+        op.execute(
+            "ALTER TABLE user_refresh_token "
+            "ADD CONSTRAINT user_refresh_token_backfilled "
+            "CHECK (token_hash IS NOT NULL AND expires_at IS NOT NULL) NOT VALID"
+        )
+        op.execute(
+            "ALTER TABLE user_refresh_token "
+            "VALIDATE CONSTRAINT user_refresh_token_backfilled"
+        )
+
+    op.alter_column("user_refresh_token", "token_hash", nullable=False)
+    op.alter_column("user_refresh_token", "expires_at", nullable=False)
+    op.drop_constraint("user_refresh_token_backfilled", "user_refresh_token")
+    op.drop_column("user_refresh_token", "token")
+    pass
+
+
+def downgrade() -> None:
+    # digests cannot be turned back into tokens, every session is logged out.
+    op.execute(sa.text("DELETE FROM user_refresh_token"))
+    op.drop_index("ix_user_refresh_token_expires_at", table_name="user_refresh_token")
+    op.drop_index("ix_user_refresh_token_token_hash", table_name="user_refresh_token")
+    op.drop_column("user_refresh_token", "expires_at")
+    op.drop_column("user_refresh_token", "token_hash")
+    op.add_column(
+        "user_refresh_token", sa.Column("token", sa.String(), nullable=False)
+    )
+    op.create_index(
+        "ix_user_refresh_token_token", "user_refresh_token", ["token"]
+    )
+    pass
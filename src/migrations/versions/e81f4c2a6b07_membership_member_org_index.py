@@ -0,0 +1,47 @@
+"""Membership Member Org Index
+
+Revision ID: e81f4c2a6b07
+Revises: 5d2b8f4e1a93
+Create Date: 2026-10-18 15:21:48.604117
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e81f4c2a6b07"
+down_revision = "5d2b8f4e1a93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (member_id, org_id) replaces the member_id index, its leading column.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_organization_member_member_id_org_id",
+            "organization_member",
+            ["member_id", "org_id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_organization_member_member_id",
+            table_name="organization_member",
+            postgresql_concurrently=True,
+        )
+    pass
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_organization_member_member_id",
+            "organization_member",
+            ["member_id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_organization_member_member_id_org_id",
+            table_name="organization_member",
+            postgresql_concurrently=True,
+        )
+    pass
@@ -0,0 +1,30 @@
+"""User Token Version
+
+Revision ID: f3b6d9a20c71
+Revises: c94a07d3e215
+Create Date: 2026-10-18 16:48:30.902217
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f3b6d9a20c71"
+down_revision = "c94a07d3e215"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "token_version", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    pass
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
+    pass
@@ -0,0 +1,79 @@
+# python imports
+from typing import Optional
+
+# application imports
+from src.app.utils.schemas_utils import User
+from src.organization import schemas
+
+
+# Row to DTO mappers. Each reads plain attributes, so it takes an ORM instance
+# or a Core row with the same column names, and builds the DTO with construct:
+# the values come from the database and are not validated or encoded twice.
+
+
+def user_dto(user) -> Optional[User]:
+    """User DTO
+
+    Args:
+        user (_type_): users row, None when the user was deleted.
+
+    Returns:
+        Optional[User]: user DTO
+    """
+    if user is None:
+        return None
+    return User.construct(
+        first_name=user.first_name, last_name=user.last_name, email=user.email
+    )
+
+
+def org_member_dto(org_member) -> schemas.OrgMember:
+    """Org Member DTO
+
+    Args:
+        org_member (_type_): organization_member row with member loaded.
+
+    Returns:
+        schemas.OrgMember: role and member DTO
+    """
+    return schemas.OrgMember.construct(
+        role=org_member.role, member=user_dto(org_member.member)
+    )
+
+
+def org_dto(org) -> schemas.OrgResponse:
+    """Org DTO
+
+    Args:
+        org (_type_): organization row with creator and org_member loaded,
+            member_count set by org_repo.load_first_members.
+
+    Returns:
+        schemas.OrgResponse: org DTO
+    """
+    return schemas.OrgResponse.construct(
+        id=org.id,
+        name=org.name,
+        slug=org.slug,
+        revoke_link=org.revoke_link,
+        creator=user_dto(org.creator),
+        members=[org_member_dto(org_member) for org_member in org.org_member],
+        member_count=getattr(org, "member_count", None),
+    )
+
+
+def org_member_response_dto(org_member) -> schemas.OrgMemberResponse:
+    """Org Member Response DTO
+
+    Args:
+        org_member (_type_): organization_member row with org and member loaded.
+
+    Returns:
+        schemas.OrgMemberResponse: org member DTO
+    """
+    return schemas.OrgMemberResponse.construct(
+        id=org_member.id,
+        org=schemas.Org.construct(name=org_member.org.name, slug=org_member.org.slug),
+        user=user_dto(org_member.member),
+        role=org_member.role,
+    )
@@ -1,5 +1,5 @@
 # 3rd party imports
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 # Application import
@@ -11,9 +11,9 @@ from src.auth.models import User
 class Organization(AbstractModel):
     __tablename__ = "organization"
     name = Column(String, nullable=False)
-    slug = Column(String, nullable=False)
+    slug = Column(String, nullable=False, unique=True, index=True)
     created_by = Column(
-        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
     )
     revoke_link = Column(Boolean, server_default=text("false"))
     creator = relationship("User")
@@ -34,3 +34,11 @@ class OrgMember(AbstractModel):
     role = Column(String, nullable=False)
     member = relationship("User")
     org = relationship("Organization")
+
+    __table_args__ = (
+        Index(
+            "ix_organization_member_org_id_member_id", "org_id", "member_id", unique=True
+        ),
+        # a user's memberships, covers org_id for index only scans
+        Index("ix_organization_member_member_id_org_id", "member_id", "org_id"),
+    )
@@ -0,0 +1,23 @@
+# application imports
+from src.auth.schemas import Principal
+from src.organization.models import Organization, OrgMember
+
+
+class OrgContext:
+    """Org Context
+
+    Request scoped: the org resolved from the slug and the logged in user's
+    membership, filled in once by the org dependencies and handed to OrgService.
+
+    Args:
+        org (Organization): org resolved from the slug.
+        org_member (OrgMember): membership of the logged in user.
+        current_user (Principal): logged in user.
+    """
+
+    def __init__(
+        self, org: Organization, org_member: OrgMember, current_user: Principal
+    ) -> None:
+        self.org = org
+        self.org_member = org_member
+        self.current_user = current_user
@@ -1,128 +1,286 @@
+# python imports
+from typing import Optional
+
 # application imports
 
+from src.app.utils.pagination import EMBEDDED_MEMBERS
+from src.app.utils.schemas_utils import RoleOptions
+from src.auth.models import User
 from src.organization.models import Organization, OrgMember
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 class OrgRepo():
     # org base query
 
-    def __init__(self, db:Session ) -> None:
+    def __init__(self, db:AsyncSession ) -> None:
         self.db = db
     def base_query(self):
-        return self.db.query(Organization)
+        return select(Organization)
+
+    # eager loading creator, members are loaded capped by load_first_members
+    def loader_options(self):
+        return (joinedload(Organization.creator),)
+
+    # org query eager loading creator
+    def loaded_query(self):
+        return self.base_query().options(*self.loader_options())
 
     # check if Org exists.
-    def check_org(self, name: str):
-        return self.base_query().filter(Organization.name.ilike(name)).first()
+    async def check_org(self, name: str):
+        return await self.db.scalar(
+            self.base_query().filter(Organization.name.ilike(name)).limit(1)
+        )
 
     # get org by slug
-    def get_org(self, slug: str):
-        return self.base_query().filter(Organization.slug == slug).first()
+    async def get_org(self, slug: str):
+        return await self.db.scalar(
+            self.base_query().filter(Organization.slug == slug).limit(1)
+        )
+
+    # get org by slug and the user's membership of it in one query,
+    # returns (org, org_member or None) or None when there is no org
+    async def get_org_membership(self, slug: str, user_id: int):
+        result = await self.db.execute(
+            select(Organization, OrgMember)
+            .outerjoin(
+                OrgMember,
+                and_(OrgMember.org_id == Organization.id, OrgMember.member_id == user_id),
+            )
+            .filter(Organization.slug == slug)
+            .limit(1)
+        )
+        return result.first()
+
+    # (re)load an org with creator and its first members
+    async def load_org(self, org_id: int):
+        org = await self.db.scalar(
+            self.loaded_query()
+            .filter(Organization.id == org_id)
+            .execution_options(populate_existing=True)
+        )
+        if org is not None:
+            await self.load_first_members([org], EMBEDDED_MEMBERS)
+        return org
+
+    # load creator and first members onto an org already in the session,
+    # without selecting the org again. The creator is usually the first member,
+    # then the get is answered from the identity map.
+    async def load_org_relations(self, org: Organization):
+        await self.load_first_members([org], EMBEDDED_MEMBERS)
+        creator = None
+        if org.created_by is not None:
+            creator = await self.db.get(User, org.created_by)
+        set_committed_value(org, "creator", creator)
+        return org
 
     # get orgs  that user is a member of.
-    def get_user_orgs(self, user_id: int):
-        return (
-            self.base_query()
-            .filter(Organization.org_member.member_id.has(id=user_id))
-            .all()
+    async def get_user_orgs(self, user_id: int):
+        user_orgs = await self.db.scalars(
+            self.base_query().filter(Organization.org_member.any(member_id=user_id))
         )
+        return user_orgs.all()
 
     # all orgs created by a user
-    def get_orgs_created_by_user(self, user_id: int):
-        return self.base_query().filter(Organization.created_by == user_id).all()
+    async def get_orgs_created_by_user(self, user_id: int):
+        user_orgs = await self.db.scalars(
+            self.base_query().filter(Organization.created_by == user_id)
+        )
+        return user_orgs.all()
 
-    # return org_count and data
-    def user_org_count_data(self, user_id: int):
-        user_org = (
-            self.base_query()
-            .filter(Organization.org_member.any(member_id=user_id))
-            .all()
+    # take one of the user's org slots, premium users are not limited.
+    # the conditional update row locks the user until commit, so concurrent
+    # creates queue on it instead of all passing the check.
+    # returns the new owned_org_count, None when the quota is used up.
+    async def reserve_org_slot(self, user_id: int, limit: int) -> Optional[int]:
+        return await self.db.scalar(
+            update(User)
+            .where(
+                User.id == user_id,
+                or_(User.is_premium.is_(True), User.owned_org_count < limit),
+            )
+            .values(owned_org_count=User.owned_org_count + 1)
+            .returning(User.owned_org_count)
+            .execution_options(synchronize_session=False)
         )
-        org_count = (
-            self.base_query()
-            .filter(Organization.org_member.any(member_id=user_id))
-            .count()
+
+    # return org_count and a page of data (keyset on id) in one statement.
+    # the user's memberships come off the (member_id, org_id) index with the
+    # total counted over all of them, before the keyset filter and limit.
+    async def user_org_count_data(
+        self, user_id: int, limit: int, after_id: Optional[int] = None
+    ):
+        memberships = (
+            select(OrgMember.org_id, func.count().over().label("org_count"))
+            .filter(OrgMember.member_id == user_id)
+            .subquery()
         )
-        return user_org, org_count
+        query = (
+            select(Organization, memberships.c.org_count)
+            .join(memberships, memberships.c.org_id == Organization.id)
+            .options(joinedload(Organization.creator))
+        )
+        if after_id is not None:
+            query = query.filter(Organization.id > after_id)
+        result = await self.db.execute(query.order_by(Organization.id).limit(limit))
+        rows = result.all()
+        if rows:
+            org_count = rows[0].org_count
+        elif after_id is None:
+            org_count = 0
+        else:
+            # the window count went with the rows, an empty later page counts apart
+            org_count = await self.db.scalar(
+                select(func.count())
+                .select_from(OrgMember)
+                .filter(OrgMember.member_id == user_id)
+            )
+        orgs = [row.Organization for row in rows]
+        await self.load_first_members(orgs, EMBEDDED_MEMBERS)
+        return orgs, org_count
 
-    # create Org
-    def create_org(self, org_create: dict):
+    # the first members of each org, by membership id, onto org.org_member and
+    # the org's full member count onto org.member_count, in one statement.
+    # Org responses embed this preview, the full member list is paged through
+    # org_member_repo.get_org_members.
+    async def load_first_members(self, orgs: list, limit: int):
+        if not orgs:
+            return
+        ranked = (
+            select(
+                OrgMember.id,
+                func.row_number()
+                .over(partition_by=OrgMember.org_id, order_by=OrgMember.id)
+                .label("rank"),
+                func.count().over(partition_by=OrgMember.org_id).label("member_count"),
+            )
+            .filter(OrgMember.org_id.in_([org.id for org in orgs]))
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(OrgMember, ranked.c.member_count)
+            .join(ranked, ranked.c.id == OrgMember.id)
+            .filter(ranked.c.rank <= limit)
+            .options(joinedload(OrgMember.member))
+            .order_by(OrgMember.id)
+        )
+        by_org = {org.id: [] for org in orgs}
+        member_counts = {}
+        for org_member, member_count in result:
+            by_org[org_member.org_id].append(org_member)
+            member_counts[org_member.org_id] = member_count
+        for org in orgs:
+            set_committed_value(org, "org_member", by_org[org.id])
+            # not a mapped column, read by the org mapper
+            org.member_count = member_counts.get(org.id, 0)
+
+    # create Org with its creator as Admin, committed together with the
+    # slot taken by reserve_org_slot
+    async def create_org(self, org_create: dict):
         new_org = Organization(**org_create)
+        new_org.org_member.append(
+            OrgMember(member_id=new_org.created_by, role=RoleOptions.admin.value)
+        )
         self.db.add(new_org)
-        self.db.commit()
-        self.db.refresh(new_org)
+        await self.db.commit()
+        await self.db.refresh(new_org)
         return new_org
 
     # update Org
-    def update_org(self, org_update: Organization):
-        self.db.commit()
-        self.db.refresh(org_update)
+    async def update_org(self, org_update: Organization):
+        await self.db.commit()
+        await self.db.refresh(org_update)
         return org_update
 
-    # delete Org
-    def delete_org(self, org: Organization):
-        self.db.delete(org)
-        self.db.commit()
+    # delete Org and give the creator's slot back in the same transaction
+    async def delete_org(self, org: Organization):
+        if org.created_by is not None:
+            await self.db.execute(
+                update(User)
+                .where(User.id == org.created_by, User.owned_org_count > 0)
+                .values(owned_org_count=User.owned_org_count - 1)
+                .execution_options(synchronize_session=False)
+            )
+        await self.db.delete(org)
+        await self.db.commit()
 
 
 class OrgMemberRepo():
 
-    def __init__(self, db:Session) -> None:
+    def __init__(self, db:AsyncSession) -> None:
         self.db = db
     # base query
     def base_query(self):
-        return self.db.query(OrgMember)
+        return select(OrgMember)
+
+    # member query eager loading org and user
+    def loaded_query(self):
+        return self.base_query().options(
+            joinedload(OrgMember.org), joinedload(OrgMember.member)
+        )
 
     # get org members based on org_id and member id
-    def get_org_member(self, org_id: int, id: int):
-        return (
-            self.base_query()
+    async def get_org_member(self, org_id: int, id: int):
+        return await self.db.scalar(
+            self.loaded_query()
             .filter(
                 OrgMember.org_id == org_id,
                 OrgMember.id == id,
             )
-            .first()
+            .limit(1)
         )
 
     # get membership data based on org_id and user_id
-    def get_org_member_by_user_id(self, org_id: int, user_id: int):
-        return (
+    async def get_org_member_by_user_id(self, org_id: int, user_id: int):
+        return await self.db.scalar(
             self.base_query()
             .filter(
                 OrgMember.org_id == org_id,
                 OrgMember.member_id == user_id,
             )
-            .first()
+            .limit(1)
         )
 
-    # get all org members by org_id
-    def get_org_members(self, org_id: int):
-        return (
-            self.base_query()
-            .filter(
-                OrgMember.org_id == org_id,
-            )
-            .all()
+    # get a page of org members by org_id (keyset on id)
+    async def get_org_members(
+        self, org_id: int, limit: int, after_id: Optional[int] = None
+    ):
+        query = self.loaded_query().filter(
+            OrgMember.org_id == org_id,
+        )
+        if after_id is not None:
+            query = query.filter(OrgMember.id > after_id)
+        org_members = await self.db.scalars(query.order_by(OrgMember.id).limit(limit))
+        return org_members.all()
+
+    # (re)load an org member with org and user
+    async def load_org_member(self, id: int):
+        return await self.db.scalar(
+            self.loaded_query()
+            .filter(OrgMember.id == id)
+            .execution_options(populate_existing=True)
         )
 
     # create org member
-    def create_org_member(self, org_member: dict):
+    async def create_org_member(self, org_member: dict):
         new_org_member = OrgMember(**org_member)
         self.db.add(new_org_member)
-        self.db.commit()
-        self.db.refresh(new_org_member)
+        await self.db.commit()
+        await self.db.refresh(new_org_member)
         return new_org_member
 
     # update org memeber
-    def update_org_member(self, org_update):
-        self.db.commit()
-        self.db.refresh(org_update)
+    async def update_org_member(self, org_update):
+        await self.db.commit()
+        await self.db.refresh(org_update)
         return org_update
 
     # delete member
-    def delete_org_member(self, org):
-        self.db.delete(org)
-        self.db.commit()
+    async def delete_org_member(self, org):
+        await self.db.delete(org)
+        await self.db.commit()
 
 
 org_repo = OrgRepo
@@ -1,14 +1,20 @@
+# python imports
+from typing import Optional
+
 # framework import
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 
 # application imports
 from src.auth.models import User
 from src.auth.oauth import get_current_user
 from src.organization import schemas
+from src.organization.org_context import OrgContext
 from src.organization.org_service import org_service
 from src.organization.pipes import org_dep
 from src.app.utils.db_utils import get_db
-from sqlalchemy.orm import Session
+from src.app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.app.utils.response_utils import model_response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 # org router
@@ -20,9 +26,9 @@ org_router = APIRouter(prefix="/api/v1/org", tags=["Organization and Org Members
     status_code=status.HTTP_201_CREATED,
     response_model=schemas.MessageOrgResp,
 )
-def create_org(
+async def create_org(
     create_workspace: schemas.OrgCreate,
-    current_user: User = Depends(org_dep.premium_ulimited_orgs),db:Session = Depends(get_db)
+    current_user: User = Depends(org_dep.premium_ulimited_orgs),db:AsyncSession = Depends(get_db)
 ):
     """Create Org
 
@@ -33,9 +39,9 @@ def create_org(
     Returns:
         _type_: Resp
     """
-    resp = org_service(db).create_org(current_user.id, create_workspace)
+    resp = await org_service(db).create_org(current_user.id, create_workspace)
 
-    return resp
+    return model_response(schemas.MessageOrgResp, resp, status.HTTP_201_CREATED)
 
 
 @org_router.get(
@@ -43,18 +49,24 @@ def create_org(
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageListOrgResp,
 )
-def get_orgs(current_user: User = Depends(get_current_user),db:Session = Depends(get_db)):
+async def get_orgs(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),db:AsyncSession = Depends(get_db)
+):
     """Get Orgs
 
     Args:
+        limit (int): page size
+        cursor (Optional[str]): next_cursor of the previous page
         current_user (User, optional): _description_. Defaults to Depends(get_current_user): Logged in User.
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).get_user_org(current_user.id)
+    resp = await org_service(db).get_user_org(current_user.id, limit, cursor)
 
-    return resp
+    return model_response(schemas.MessageListOrgResp, resp, status.HTTP_200_OK)
 
 
 @org_router.get(
@@ -62,19 +74,19 @@ def get_orgs(current_user: User = Depends(get_current_user),db:Session = Depends
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageOrgResp,
 )
-def get_org(org_slug: str, current_user: User = Depends(org_dep.member_dep),db:Session = Depends(get_db)):
+async def get_org(org_slug: str, org_ctx: OrgContext = Depends(org_dep.member_dep),db:AsyncSession = Depends(get_db)):
     """Get Org
 
     Args:
         org_slug (str): slug
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.member_dep): Logged in Org Member
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.member_dep): Logged in Org Member
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).get_org(org_slug)
+    resp = await org_service(db).get_org(org_ctx)
 
-    return resp
+    return model_response(schemas.MessageOrgResp, resp, status.HTTP_200_OK)
 
 
 @org_router.patch(
@@ -82,41 +94,41 @@ def get_org(org_slug: str, current_user: User = Depends(org_dep.member_dep),db:S
     response_model=schemas.MessageOrgResp,
     status_code=status.HTTP_200_OK,
 )
-def org_update(
+async def org_update(
     org_slug: str,
     update_org: schemas.OrgUpdate,
-    current_user: User = Depends(org_dep.admin_rights_dep),db:Session = Depends(get_db)
+    org_ctx: OrgContext = Depends(org_dep.admin_rights_dep),db:AsyncSession = Depends(get_db)
 ):
     """Org Update
 
     Args:
         org_slug (str): Slug
         update_org (schemas.OrgUpdate): Data
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep): Loggeed inn userr with write access.
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep): Loggeed inn userr with write access.
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).update_org(org_slug, update_org)
+    resp = await org_service(db).update_org(org_ctx, update_org)
 
-    return resp
+    return model_response(schemas.MessageOrgResp, resp, status.HTTP_200_OK)
 
 
 @org_router.delete(
     "/{org_slug}/delete/",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def org_delete(org_slug: str, current_user: User = Depends(org_dep.admin_rights_dep),db:Session = Depends(get_db)):
+async def org_delete(org_slug: str, org_ctx: OrgContext = Depends(org_dep.admin_rights_dep),db:AsyncSession = Depends(get_db)):
     """Delete Organization
 
     Args:
         org_slug (str): Slug
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep)= Write access.
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep)= Write access.
 
     Returns:
         _type_: 204
     """
-    org_service(db).delete_org(org_slug)
+    await org_service(db).delete_org(org_ctx)
 
     return {"status": status.HTTP_204_NO_CONTENT}
 
@@ -126,22 +138,22 @@ def org_delete(org_slug: str, current_user: User = Depends(org_dep.admin_rights_
     status_code=status.HTTP_200_OK,
     response_model=schemas.InviteOrgResponse,
 )
-def generate_org_invite_link(
+async def generate_org_invite_link(
     org_slug: str,
     role_data: schemas.UpdateOrgMember,
-    current_user: User = Depends(org_dep.admin_rights_dep),db:Session = Depends(get_db)
+    org_ctx: OrgContext = Depends(org_dep.admin_rights_dep),db:AsyncSession = Depends(get_db)
 ):
     """GENERATE ORG LINK
 
     Args:
         org_slug (str): str
         role_data (schemas.UpdateOrgMember): role information
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep).
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep).
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).org_link_invite(org_slug, role_data.role)
+    resp = await org_service(db).org_link_invite(org_ctx, role_data.role)
 
     return resp
 
@@ -151,18 +163,18 @@ def generate_org_invite_link(
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageOrgResp,
 )
-def revoke_org(org_slug: str, current_user: User = Depends(org_dep.admin_rights_dep),db:Session = Depends(get_db)):
+async def revoke_org(org_slug: str, org_ctx: OrgContext = Depends(org_dep.admin_rights_dep),db:AsyncSession = Depends(get_db)):
     """Revoke Org Access
 
     Args:
         org_slug (str): slug
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep): Logged in user with right access.
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep): Logged in user with right access.
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).revoke_org_link(org_slug)
-    return resp
+    resp = await org_service(db).revoke_org_link(org_ctx)
+    return model_response(schemas.MessageOrgResp, resp, status.HTTP_200_OK)
 
 
 @org_router.post(
@@ -170,7 +182,7 @@ def revoke_org(org_slug: str, current_user: User = Depends(org_dep.admin_rights_
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageOrgMembResp,
 )
-def org_member_join(token: str, role_token: str, new_org_member: schemas.JoinOrg,db:Session = Depends(get_db)):
+async def org_member_join(token: str, role_token: str, new_org_member: schemas.JoinOrg,db:AsyncSession = Depends(get_db)):
     """Join Org
 
     Args:
@@ -181,9 +193,9 @@ def org_member_join(token: str, role_token: str, new_org_member: schemas.JoinOrg
     Returns:
         _type_: resp
     """
-    resp = org_service(db).join_org(token, role_token, new_org_member)
+    resp = await org_service(db).join_org(token, role_token, new_org_member)
 
-    return resp
+    return model_response(schemas.MessageOrgMembResp, resp, status.HTTP_200_OK)
 
 
 @org_router.get(
@@ -191,22 +203,22 @@ def org_member_join(token: str, role_token: str, new_org_member: schemas.JoinOrg
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageOrgMembResp,
 )
-def get_org_member(
-    org_slug: str, member_id: int, current_user: User = Depends(org_dep.member_dep),db:Session = Depends(get_db)
+async def get_org_member(
+    org_slug: str, member_id: int, org_ctx: OrgContext = Depends(org_dep.member_dep),db:AsyncSession = Depends(get_db)
 ):
     """Get Org  Member
 
     Args:
         org_slug (str): Slug
         member_id (int): Member id
-        current_user (User, optional): _description_. Defaults to Depends(get_current_user): Logged in User a member of Org.
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.member_dep): Logged in User a member of Org.
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).get_org_member(member_id, org_slug)
+    resp = await org_service(db).get_org_member(member_id, org_ctx)
 
-    return resp
+    return model_response(schemas.MessageOrgMembResp, resp, status.HTTP_200_OK)
 
 
 @org_router.get(
@@ -214,19 +226,26 @@ def get_org_member(
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageListOrgMemResp,
 )
-def get_org_members(org_slug: str, current_user: User = Depends(org_dep.member_dep),db:Session = Depends(get_db)):
+async def get_org_members(
+    org_slug: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    org_ctx: OrgContext = Depends(org_dep.member_dep),db:AsyncSession = Depends(get_db)
+):
     """Get All ORg Members
 
     Args:
         org_slug (str): slug
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.member_dep): Logged in Member of Org.
+        limit (int): page size
+        cursor (Optional[str]): next_cursor of the previous page
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.member_dep): Logged in Member of Org.
 
     Returns:
         _type_: Resp
     """
-    resp = org_service(db).get_all_org_member(org_slug)
+    resp = await org_service(db).get_all_org_member(org_ctx, limit, cursor)
 
-    return resp
+    return model_response(schemas.MessageListOrgMemResp, resp, status.HTTP_200_OK)
 
 
 @org_router.patch(
@@ -234,11 +253,11 @@ def get_org_members(org_slug: str, current_user: User = Depends(org_dep.member_d
     status_code=status.HTTP_200_OK,
     response_model=schemas.MessageOrgMembResp,
 )
-def update_org_member(
+async def update_org_member(
     org_slug: str,
     member_id: int,
     update_org_member: schemas.UpdateOrgMember,
-    current_user: User = Depends(org_dep.admin_rights_dep),db:Session = Depends(get_db)
+    org_ctx: OrgContext = Depends(org_dep.admin_rights_dep),db:AsyncSession = Depends(get_db)
 ):
     """_summary_
 
@@ -246,36 +265,36 @@ def update_org_member(
         org_slug (str): slug
         member_id (int): member id
         update_org_member (schemas.UpdateOrgMember): role data
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep).
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep).
 
     Returns:
         _type_: resp
     """
-    resp = org_service(db).update_org_member(org_slug, member_id, update_org_member)
+    resp = await org_service(db).update_org_member(org_ctx, member_id, update_org_member)
 
-    return resp
+    return model_response(schemas.MessageOrgMembResp, resp, status.HTTP_200_OK)
 
 
 @org_router.delete(
     "/{org_slug}/member/{member_id}/delete/",
     status_code=status.HTTP_204_NO_CONTENT
 )
-def delete_workspace_member(
+async def delete_workspace_member(
     org_slug: str,
     member_id: int,
-    current_user: User = Depends(org_dep.admin_rights_dep),db:Session = Depends(get_db)
+    org_ctx: OrgContext = Depends(org_dep.admin_rights_dep),db:AsyncSession = Depends(get_db)
 ):
     """Remove from Organization
 
     Args:
         org_slug (str): Slug
         member_id (int): Member id
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep): Logged in User with right permissions.
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.admin_rights_dep): Logged in User with right permissions.
 
     Returns:
         _type_: 204
     """
-    org_service(db).delete_org_member(org_slug, member_id)
+    await org_service(db).delete_org_member(org_ctx, member_id)
 
     return {"status": status.HTTP_204_NO_CONTENT}
 
@@ -285,16 +304,16 @@ def delete_workspace_member(
     status_code=status.HTTP_200_OK,
     response_model=schemas.ResponseModel,
 )
-def leave_workspace(org_slug: str, current_user: User = Depends(org_dep.member_dep),db:Session = Depends(get_db)):
+async def leave_workspace(org_slug: str, org_ctx: OrgContext = Depends(org_dep.member_dep),db:AsyncSession = Depends(get_db)):
     """Leave a Workspace
 
     Args:
         org_slug (str): org slug
-        current_user (User, optional): _description_. Defaults to Depends(org_dep.member_dep)= Logged in User with the right permission.
+        org_ctx (OrgContext, optional): _description_. Defaults to Depends(org_dep.member_dep)= Logged in User with the right permission.
 
     Returns:
         _type_: _description_
     """
-    org_service(db).leave_org(org_slug, current_user)
+    await org_service(db).leave_org(org_ctx)
 
     return {"status": status.HTTP_200_OK, "message": "Logged In User left Orgnizaton."}
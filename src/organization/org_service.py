@@ -1,15 +1,20 @@
+# python imports
+from typing import Optional
+
 # Fastapi imports
 from fastapi import HTTPException, status
-from fastapi.encoders import jsonable_encoder
 
 # application imports
 from src.app.config import auth_settings
+from src.app.utils.pagination import decode_cursor, paginate
 from src.app.utils.schemas_utils import RoleOptions
 from src.app.utils.slugger import slug_gen
 from src.app.utils.token import gen_token, retrieve_token
 from src.auth.auth_repository import user_repo
 from src.organization import schemas
+from src.organization.mappers import org_dto, org_member_response_dto
 from src.organization.models import Organization, OrgMember
+from src.organization.org_context import OrgContext
 from src.organization.org_repository import org_member_repo, org_repo
 
 
@@ -20,25 +25,19 @@ class OrgService:
         self.org_repo = org_repo(self.db)
         self.org_member_repo = org_member_repo(self.db)
 
-    # orm call org
-    def orm_call(self, org: Organization):
-        org_ = org.__dict__
-        org_["creator"] = org.creator
-        org_["members"] = org.org_member
-        return org_
-
-    # orm call org member
-    def member_orm_call(self, org_member: OrgMember):
-        org_member_ = jsonable_encoder(org_member)
-        org_member_["org"] = org_member.org
-        org_member_["user"] = org_member.member
-        return org_member_
-
-    def create_org(
+    # orm call org, expects an org from org_repo.loaded_query
+    def orm_call(self, org: Organization) -> schemas.OrgResponse:
+        return org_dto(org)
+
+    # orm call org member, expects a member from org_member_repo.loaded_query
+    def member_orm_call(self, org_member: OrgMember) -> schemas.OrgMemberResponse:
+        return org_member_response_dto(org_member)
+
+    async def create_org(
         self, user_id: int, org_create: schemas.OrgCreate
     ) -> schemas.MessageOrgResp:
         # check org
-        org_check = self.org_repo.check_org(org_create.name)
+        org_check = await self.org_repo.check_org(org_create.name)
         if org_check:
             raise HTTPException(
                 detail="Org exist", status_code=status.HTTP_409_CONFLICT
@@ -48,17 +47,10 @@ class OrgService:
         org_dict["slug"] = slug_gen()[:14]
         org_dict["created_by"] = user_id
 
-        # create org
-        org = self.org_repo.create_org(org_dict)
-        # org member data mapping
-        org_member_dict = {
-            "org_id": org.id,
-            "member_id": user_id,
-            "role": RoleOptions.admin.value,
-        }
-        # create org member
-        self.org_member_repo.create_org_member(org_member_dict)
+        # create org and its admin membership in one transaction
+        org = await self.org_repo.create_org(org_dict)
         # org orm member
+        org = await self.org_repo.load_org(org.id)
         org = self.orm_call(org)
         resp = {
             "message": "Org Created Successfully",
@@ -68,14 +60,9 @@ class OrgService:
 
         return resp
 
-    def get_org(self, slug: str) -> schemas.MessageOrgResp:
-        # chek for org
-        org = self.org_repo.get_org(slug)
-        if not org:
-            raise HTTPException(
-                detail="Org does not exists",
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
+    async def get_org(self, org_ctx: OrgContext) -> schemas.MessageOrgResp:
+        # load creator and members onto the context org
+        org = await self.org_repo.load_org_relations(org_ctx.org)
 
         # orm call
         org_ = self.orm_call(org)
@@ -86,46 +73,47 @@ class OrgService:
         }
         return resp
 
-    def get_user_org(self, user_id: int) -> schemas.MessageListOrgResp:
-        # all orgs a user belongs too
-        user_orgs, _ = self.org_repo.user_org_count_data(user_id)
-        # if not ORg raise HTTPException
-        if not user_orgs:
+    async def get_user_org(
+        self, user_id: int, limit: int, cursor: Optional[str] = None
+    ) -> schemas.MessageListOrgResp:
+        # a page of the orgs a user belongs too, one extra row tells if there is more
+        user_orgs, org_count = await self.org_repo.user_org_count_data(
+            user_id, limit + 1, decode_cursor(cursor)
+        )
+        user_orgs, next_cursor = paginate(user_orgs, limit)
+        # if not ORg raise HTTPException, a later page may be empty when its
+        # rows were deleted after the cursor was issued
+        if not user_orgs and cursor is None:
             raise HTTPException(
                 detail="User Does not have Orgs",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
         # ORM call
-        orgs = []
-        for user_org in user_orgs:
-            orgs.append(self.orm_call(user_org))
+        orgs = [self.orm_call(user_org) for user_org in user_orgs]
 
         resp = {
             "message": "User Orgs retrieved successfully",
             "data": orgs,
+            "total": org_count,
+            "next_cursor": next_cursor,
             "status": status.HTTP_200_OK,
         }
         return resp
 
-    def update_org(
-        self, slug: str, update_org: schemas.OrgUpdate
+    async def update_org(
+        self, org_ctx: OrgContext, update_org: schemas.OrgUpdate
     ) -> schemas.MessageOrgResp:
-        # check org
-        org = self.org_repo.get_org(slug)
-        if not org:
-            raise HTTPException(
-                detail="Org does not exists",
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
+        org = org_ctx.org
         # update Org
         org_update_ = update_org.dict(exclude_unset=True)
         # update org
         for key, value in org_update_.items():
             setattr(org, key, value)
 
-        org = self.org_repo.update_org(org)
+        await self.org_repo.update_org(org)
         # orm call
+        org = await self.org_repo.load_org(org.id)
         org_ = self.orm_call(org)
         resp = {
             "message": "Org Updated Successfully",
@@ -134,17 +122,9 @@ class OrgService:
         }
         return resp
 
-    def delete_org(self, slug: str):
-        # check org
-        org = self.org_repo.get_org(slug)
-
-        if not org:
-            raise HTTPException(
-                detail="Org does not exists",
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
+    async def delete_org(self, org_ctx: OrgContext):
         # delete org
-        self.org_repo.delete_org(org)
+        await self.org_repo.delete_org(org_ctx.org)
 
     # raise HTTPException if not org
     def org_check(self, workspace):
@@ -153,17 +133,15 @@ class OrgService:
                 detail="Org does not exist", status_code=status.HTTP_404_NOT_FOUND
             )
 
-    def org_link_invite(self, slug: str, role: RoleOptions):
-        #  check org
-        org = self.org_repo.get_org(slug)
-        self.org_check(org)
+    async def org_link_invite(self, org_ctx: OrgContext, role: RoleOptions):
+        org = org_ctx.org
 
         # generate tokens
         token = gen_token(org.slug)
         role_tok = gen_token(role)
         if org.revoke_link:
             org.revoke_link = False
-            self.org_repo.update_org(org)
+            await self.org_repo.update_org(org)
 
         name = org.name.split(" ")
         name = "-".join(name)
@@ -176,15 +154,14 @@ class OrgService:
         }
         return resp
 
-    def revoke_org_link(self, org_slug: str):
-        # check for org
-        org = self.org_repo.get_org(org_slug)
-        self.org_check(org)
+    async def revoke_org_link(self, org_ctx: OrgContext):
+        org = org_ctx.org
         # revoke link
         org.revoke_link = True
         # org update
-        self.org_repo.update_org(org)
+        await self.org_repo.update_org(org)
         # orm call
+        org = await self.org_repo.load_org(org.id)
         org_ = self.orm_call(org)
 
         resp = {
@@ -195,8 +172,8 @@ class OrgService:
         return resp
 
     # member org check
-    def get_org_member_check(self, id: int, org_id: int):
-        return self.org_member_repo.get_org_member(org_id, id)
+    async def get_org_member_check(self, id: int, org_id: int):
+        return await self.org_member_repo.get_org_member(org_id, id)
 
     # raise Exception if not a member
     def org_member_check(self, org_member):
@@ -214,7 +191,7 @@ class OrgService:
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
-    def join_org(
+    async def join_org(
         self, token: str, role_token: str, join_workspace: schemas.JoinOrg
     ) -> schemas.MessageOrgMembResp:
         token_data = retrieve_token(token)
@@ -229,7 +206,7 @@ class OrgService:
             role_tok_data = RoleOptions.member
 
         # check if org exists.
-        org_check = self.org_repo.get_org(token_data)
+        org_check = await self.org_repo.get_org(token_data)
 
         if not org_check:
             raise HTTPException(
@@ -242,7 +219,7 @@ class OrgService:
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
         # check if invited email belongs to a user
-        user_check = user_repo(self.db).get_user(join_workspace.email)
+        user_check = await user_repo(self.db).get_user(join_workspace.email)
         # raise Exception if no User
         if not user_check:
             raise HTTPException(
@@ -251,7 +228,7 @@ class OrgService:
             )
 
         # check if user is a member of the org
-        org_mem_check = self.org_member_repo.get_org_member_by_user_id(
+        org_mem_check = await self.org_member_repo.get_org_member_by_user_id(
             org_check.id, user_check.id
         )
         self.org_member_check_(org_mem_check)
@@ -262,7 +239,8 @@ class OrgService:
             "org_id": org_check.id,
         }
         # create org member
-        org_member = self.org_member_repo.create_org_member(org_member_data)
+        org_member = await self.org_member_repo.create_org_member(org_member_data)
+        org_member = await self.org_member_repo.load_org_member(org_member.id)
         # orm call
         org_member_ = self.member_orm_call(org_member)
         resp = {
@@ -273,12 +251,11 @@ class OrgService:
 
         return resp
 
-    def get_org_member(self, id: int, org_slug: str) -> schemas.MessageOrgMembResp:
-        # get Org
-        org = self.org_repo.get_org(org_slug)
-        self.org_check(org)
+    async def get_org_member(
+        self, id: int, org_ctx: OrgContext
+    ) -> schemas.MessageOrgMembResp:
         # check Org Member
-        org_member_check = self.get_org_member_check(id, org.id)
+        org_member_check = await self.get_org_member_check(id, org_ctx.org.id)
         self.org_member_check(org_member_check)
         # orm call
         org_member = self.member_orm_call(org_member_check)
@@ -290,43 +267,46 @@ class OrgService:
 
         return resp
 
-    def get_all_org_member(self, org_slug: str) -> schemas.MessageListOrgResp:
-        # check org
-        org = self.org_repo.get_org(org_slug)
-        self.org_check(org)
-
-        # check for members
-        org_member_check = self.org_member_repo.get_org_members(org.id)
-        self.org_member_check(org_member_check)
+    async def get_all_org_member(
+        self, org_ctx: OrgContext, limit: int, cursor: Optional[str] = None
+    ) -> schemas.MessageListOrgMemResp:
+        # check for members, one extra row tells if there is another page
+        org_member_check = await self.org_member_repo.get_org_members(
+            org_ctx.org.id, limit + 1, decode_cursor(cursor)
+        )
+        # only the first page proves there are no members, a later one is
+        # empty when the members after the cursor left
+        if cursor is None:
+            self.org_member_check(org_member_check)
+        org_member_check, next_cursor = paginate(org_member_check, limit)
 
         # orm call
-        org_member_ = []
-        for org_member in org_member_check:
-            org_member_.append(self.member_orm_call(org_member))
+        org_member_ = [
+            self.member_orm_call(org_member) for org_member in org_member_check
+        ]
 
         resp = {
             "message": "Org Members retrieved successfully",
             "data": org_member_,
+            "next_cursor": next_cursor,
             "status": status.HTTP_200_OK,
         }
         return resp
 
-    def update_org_member(
+    async def update_org_member(
         self,
-        org_slug: str,
+        org_ctx: OrgContext,
         id: int,
         role_update: schemas.UpdateOrgMember,
     ):
-        # org check
-        org = self.org_repo.get_org(org_slug)
-        self.org_check(org)
         # member check
-        org_member = self.org_member_repo.get_org_member(org.id, id)
+        org_member = await self.org_member_repo.get_org_member(org_ctx.org.id, id)
         self.org_member_check(org_member)
         # Update role
         org_member.role = role_update.role
         # update org member insntance
-        org_member = self.org_member_repo.update_org_member(org_member)
+        await self.org_member_repo.update_org_member(org_member)
+        org_member = await self.org_member_repo.load_org_member(org_member.id)
         org_member_ = self.member_orm_call(org_member)
         resp = {
             "message": "Org Member Updated Successfully",
@@ -336,25 +316,16 @@ class OrgService:
 
         return resp
 
-    def delete_org_member(self, org_slug: str, user_id: int):
-        # check for Org
-        org = self.org_repo.get_org(org_slug)
-        self.org_check(org)
+    async def delete_org_member(self, org_ctx: OrgContext, user_id: int):
         # checking for org memeber
-        org_member = self.org_member_repo.get_org_member(org.id, user_id)
+        org_member = await self.org_member_repo.get_org_member(org_ctx.org.id, user_id)
         self.org_member_check(org_member)
         # deleting the org memeber
-        self.org_member_repo.delete_org_member(org_member)
-
-    def leave_org(self, org_slug: str, user_id: int):
-        # check for ORg
-        org = self.org_repo.get_org(org_slug)
-        self.org_check(org)
-        # check for org_member innstance
-        org_member = self.org_member_repo.get_org_member_by_user_id(org.id, user_id)
-        self.org_member_check(org_member)
-        # deleting the instance
-        self.org_member_repo.delete_org_member(org_member)
+        await self.org_member_repo.delete_org_member(org_member)
+
+    async def leave_org(self, org_ctx: OrgContext):
+        # the membership was resolved by the dependency, deleting the instance
+        await self.org_member_repo.delete_org_member(org_ctx.org_member)
 
 
 org_service = OrgService
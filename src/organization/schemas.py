@@ -5,7 +5,13 @@ from typing import List, Optional, Union
 from pydantic import EmailStr
 
 # application imports
-from src.app.utils.schemas_utils import AbstractModel, ResponseModel, RoleOptions, User
+from src.app.utils.schemas_utils import (
+    AbstractModel,
+    PaginatedResponseModel,
+    ResponseModel,
+    RoleOptions,
+    User,
+)
 
 
 # Org Create DTO
@@ -24,8 +30,12 @@ class OrgResponse(OrgCreate):
     id: int
     slug: str
     revoke_link: Optional[bool]
-    creator: User
+    # None once the creator deleted their account, see user_dto
+    creator: Optional[User]
+    # the first EMBEDDED_MEMBERS members, page the rest via /org/{slug}/members/
     members: Union[List[OrgMember], None]
+    # all members of the org, more than len(members) when the list is cut
+    member_count: Optional[int]
 
 
 # Org Response DTO
@@ -34,8 +44,9 @@ class MessageOrgResp(ResponseModel):
 
 
 # All Org Response DTO
-class MessageListOrgResp(ResponseModel):
+class MessageListOrgResp(PaginatedResponseModel):
     data: List[OrgResponse]
+    total: Optional[int]
 
 
 # Org Update
@@ -69,7 +80,7 @@ class MessageOrgMembResp(ResponseModel):
 
 
 # List of OrgMembersResponse DTO
-class MessageListOrgMemResp(ResponseModel):
+class MessageListOrgMemResp(PaginatedResponseModel):
     data: List[OrgMemberResponse]
 
 
@@ -15,8 +15,8 @@ class OrgPerms:
         self.member_repo = org_member_repo(self.db)
 
     # check if an Organization Exists
-    def org_check(self, org_slug: str):
-        org_ = self.repo.get_org(org_slug)
+    async def org_check(self, org_slug: str):
+        org_ = await self.repo.get_org(org_slug)
         if not org_:
             raise HTTPException(
                 detail="No Organization with this slug",
@@ -25,24 +25,30 @@ class OrgPerms:
 
         return org_
 
-    # checks if a user is a Memeber of an Organization
-    def org_member_check(self, current_user: User, org_slug: str):
-        org = self.org_check(org_slug)
-        org_member = self.member_repo.get_org_member_by_user_id(org.id, current_user.id)
+    # checks if a user is a Memeber of an Organization, returns (org, org_member)
+    async def org_member_check(self, current_user: User, org_slug: str):
+        membership = await self.repo.get_org_membership(org_slug, current_user.id)
+        if not membership:
+            raise HTTPException(
+                detail="No Organization with this slug",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        org, org_member = membership
         if not org_member:
             raise HTTPException(
                 detail="Logged in User is not a member of this Organization",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
-        return org_member
+        return org, org_member
 
-    # Checks if a user is an Admin
-    def admin_right(self, current_user: User, org_slug: str):
-        org_member = self.org_member_check(current_user, org_slug)
+    # Checks if a user is an Admin, returns (org, org_member)
+    async def admin_right(self, current_user: User, org_slug: str):
+        org, org_member = await self.org_member_check(current_user, org_slug)
         if org_member.role != RoleOptions.admin.value:
             raise HTTPException(
                 detail="Org Member is not Admin", status_code=status.HTTP_409_CONFLICT
             )
+        return org, org_member
 
 
 # instantiaion OrgPerms
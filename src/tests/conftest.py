@@ -1,19 +1,65 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from src.tests.query_counter import QueryBudgetClient, count_queries
+
 from src.app import main
+from src.app.celery_jobs import job, send_mail_task
 from src.app.config import test_status
-from src.app.database import Base, test_engine,TestFactory
+from src.app.database import AsyncTestFactory, Base, test_engine,TestFactory
 from src.app.utils.token import gen_token
-from src.auth.oauth import create_access_token, create_refresh_token
+from src.auth.auth_repository import principal_cache, token_version_cache
+from src.auth.oauth import (
+    access_claims_cache,
+    create_access_token,
+    create_refresh_token,
+)
 from src.app.utils.db_utils import get_db
 
+# Celery runs tasks inline against an in-memory broker, a failed mail is not retried
+job.conf.update(task_always_eager=True, broker_url="memory://")
+send_mail_task.max_retries = 0
+
+# SQL statement budgets per endpoint, a request over budget fails its test.
+# Routes behind get_current_user include its lookup, a cold principal cache.
+auth_prefix = "/api/v1/auth"
+org_prefix = "/api/v1/org"
+query_budgets = {
+    ("POST", f"{auth_prefix}/register/"): 3,
+    ("POST", f"{auth_prefix}/login/"): 4,
+    ("GET", f"{auth_prefix}/me/"): 2,
+    ("PATCH", f"{auth_prefix}/update/"): 4,
+    ("DELETE", f"{auth_prefix}/delete/"): 4,
+    ("GET", f"{auth_prefix}/refresh/"): 2,
+    ("PATCH", f"{auth_prefix}/change-password/"): 5,
+    ("POST", f"{auth_prefix}/password-reset/complete/{{token}}/"): 4,
+    ("POST", f"{auth_prefix}/reset-password/"): 1,
+    ("POST", f"{auth_prefix}/resend-account-verification/"): 1,
+    ("POST", f"{auth_prefix}/account-verification/{{token}}/"): 3,
+    ("POST", f"{org_prefix}/create/"): 8,
+    ("GET", f"{org_prefix}s/"): 3,
+    ("GET", f"{org_prefix}/{{org_slug}}/"): 3,
+    ("PATCH", f"{org_prefix}/{{org_slug}}/update/"): 6,
+    ("DELETE", f"{org_prefix}/{{org_slug}}/delete/"): 6,
+    ("POST", f"{org_prefix}/{{org_slug}}/invite-link/gen/"): 4,
+    ("POST", f"{org_prefix}/{{org_slug}}/revoke-link/"): 6,
+    ("POST", f"{org_prefix}/join/"): 6,
+    ("GET", f"{org_prefix}/{{org_slug}}/member/{{member_id}}/"): 3,
+    ("GET", f"{org_prefix}/{{org_slug}}/members/"): 3,
+    ("PATCH", f"{org_prefix}/{{org_slug}}/member/{{member_id}}/update/"): 6,
+    ("DELETE", f"{org_prefix}/{{org_slug}}/member/{{member_id}}/delete/"): 4,
+    ("DELETE", f"{org_prefix}/{{org_slug}}/member/leave/"): 3,
+}
+
 # Test SQLAlchemy DBURL
 
 @pytest.fixture
 def session():
     Base.metadata.drop_all(test_engine)
     Base.metadata.create_all(test_engine)
+    principal_cache.clear()
+    access_claims_cache.clear()
+    token_version_cache.clear()
 
 
 
@@ -32,15 +78,18 @@ def session():
 def client(session):
 
     # run our code beforewe  run our test
-    def get_test_db():
-        try:
-
-            yield session
-        finally:
-            session.close()
+    async def get_test_db():
+        async with AsyncTestFactory() as db:
+            yield db
 
     main.app.dependency_overrides[get_db] = get_test_db
-    yield TestClient(main.app)
+    yield QueryBudgetClient(main.app, query_budgets)
+
+
+@pytest.fixture
+def query_counter():
+    # count_queries, as a fixture: with query_counter() as queries: ...
+    return count_queries
 
 
 
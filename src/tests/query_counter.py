@@ -0,0 +1,113 @@
+# python imports
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# 3rd party imports
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+# application imports
+from src.app.database import async_test_engine
+
+
+class QueryCounter:
+    """Query Counter
+
+    SQL statements executed on an engine while counting, see count_queries.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.statements: List[str] = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, min_count: int = 2) -> Dict[str, int]:
+        # identical statements run min_count times or more, the N+1 signature
+        return {
+            statement: count
+            for statement, count in Counter(self.statements).items()
+            if count >= min_count
+        }
+
+    def report(self) -> str:
+        lines = [f"{self.count} SQL statements"]
+        for i, statement in enumerate(self.statements, 1):
+            lines.append(f"  {i}. {statement}")
+        repeated = self.repeated()
+        if repeated:
+            lines.append("repeated statements:")
+            for statement, count in repeated.items():
+                lines.append(f"  {count}x {statement}")
+        return "\n".join(lines)
+
+    def assert_max(self, budget: int, label: str = "block") -> None:
+        assert self.count <= budget, (
+            f"{label} ran {self.count} SQL statements, budget is {budget}\n"
+            f"{self.report()}"
+        )
+
+
+@contextmanager
+def count_queries(engine: Engine = async_test_engine.sync_engine):
+    """Count Queries
+
+    Args:
+        engine (Engine): sync engine, the async test engine by default.
+
+    Yields:
+        QueryCounter: statements executed inside the block.
+    """
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter.record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter.record)
+
+
+class QueryBudgetClient(TestClient):
+    """Query Budget Client
+
+    TestClient that counts the SQL statements of every request and fails the
+    test when a route runs more than its budget.
+
+    Args:
+        app (_type_): ASGI app.
+        budgets (Dict[Tuple[str, str], int]): (method, route path) -> max statements.
+    """
+
+    def __init__(self, app, budgets: Dict[Tuple[str, str], int], **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self.routes = app.routes
+        self.budgets = budgets
+
+    def route_path(self, method: str, url) -> Optional[str]:
+        scope = {"type": "http", "method": method, "path": urlsplit(str(url)).path}
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return None
+
+    def request(self, method: str, url, *args, **kwargs):
+        with count_queries() as queries:
+            response = super().request(method, url, *args, **kwargs)
+        # the last request sent, after any redirect
+        method = response.request.method
+        route = self.route_path(method, response.request.url)
+        budget = self.budgets.get((method, route))
+        if budget is not None:
+            queries.assert_max(budget, f"{method} {route}")
+        return response
@@ -1,6 +1,16 @@
+from types import SimpleNamespace
+
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
 
+from src.app.celery_jobs import send_mail_task
 from src.app.utils.token import auth_token
+from src.auth.auth_repository import TokenRepo, principal_cache
+from src.auth.oauth import access_secret_key, create_access_token, decode_token
+from src.app.utils.cache import TTLCache
+from src.app.config import auth_settings
+from src.app.utils.timing_utils import register_query_timing, request_timings
 from src.tests.conftest import (
     TestClient,
     client,
@@ -19,6 +29,74 @@ def test_root(client):
     assert res.status_code == 200
 
 
+def test_server_timing(first_auth_client):
+    client: TestClient = first_auth_client
+    res = client.get(f"{auth_route}/me/")
+    assert res.status_code == 200
+    server_timing = res.headers["server-timing"]
+    assert "jwt;dur=" in server_timing
+    assert "db;dur=" in server_timing
+    assert "total;dur=" in server_timing
+
+
+def test_query_timing_after_failed_statement():
+    engine = create_engine("sqlite://")
+    register_query_timing(engine)
+    timings = {}
+    token = request_timings.set(timings)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(DBAPIError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+            conn.exec_driver_sql("SELECT 1")
+            # the failed statement left no start time on the connection
+            assert "query_start" not in conn.info
+    finally:
+        request_timings.reset(token)
+    assert timings["db"][1] == 1
+
+
+def test_db_pool(client, monkeypatch):
+    client: TestClient = client
+    # disabled until a token is configured
+    assert client.get("/internal/db-pool/").status_code == 404
+
+    monkeypatch.setattr(auth_settings, "internal_token", "internal-secret")
+    res = client.get("/internal/db-pool/", headers={"X-Internal-Token": "wrong"})
+    assert res.status_code == 404
+    res = client.get(
+        "/internal/db-pool/", headers={"X-Internal-Token": "internal-secret"}
+    )
+    assert res.status_code == 200
+    data = res.json().get("data")
+    for key in ["checked_out", "idle", "overflow", "wait_time_total"]:
+        assert key in data
+
+
+def test_password_hashing_status(client, monkeypatch):
+    client: TestClient = client
+    assert client.get("/internal/password-hashing/").status_code == 404
+
+    monkeypatch.setattr(auth_settings, "internal_token", "internal-secret")
+    res = client.get(
+        "/internal/password-hashing/", headers={"X-Internal-Token": "internal-secret"}
+    )
+    assert res.status_code == 200
+
+
+def test_metrics(client, monkeypatch):
+    client: TestClient = client
+    client.get("/")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(auth_settings, "internal_token", "internal-secret")
+    res = client.get("/metrics", headers={"Authorization": "Bearer internal-secret"})
+    assert res.status_code == 200
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in res.text
+    # every auth and org route is exported before its first request
+    assert 'route="/api/v1/org/create/"' in res.text
+
+
 @pytest.mark.asyncio
 async def test_registration(client):
     client: TestClient = client
@@ -30,6 +108,29 @@ async def test_registration(client):
     assert res.status_code == 201
 
 
+def test_registration_broker_down(client, monkeypatch):
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(send_mail_task, "delay", broker_down)
+    res = client.post(f"{auth_route}/register/", json=user_data)
+
+    # the account is created, the verification mail can be resent later
+    assert res.status_code == 201
+    assert res.json().get("data")["email"] == user_data["email"]
+
+
+def test_resend_verification_broker_down(client, second_user, monkeypatch):
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(send_mail_task, "delay", broker_down)
+    email_data = {"email": second_user_data["email"]}
+    res = client.post(f"{auth_route}/resend-account-verification/", json=email_data)
+
+    assert res.json().get("message") == "Account Verification Mail was not sent"
+
+
 def test_login(client, first_user):
     client: TestClient = client
     res = client.post(
@@ -42,6 +143,23 @@ def test_login(client, first_user):
     assert data["data"]["email"] == first_user_data["email"]
 
 
+def test_login_email_exact_match(client, first_user, second_user):
+    client: TestClient = client
+    res = client.post(
+        f"{auth_route}/login/",
+        data={"username": first_user["email"].upper(), "password": first_user["password"]},
+    )
+    assert res.status_code == 200
+    assert res.json().get("data")["data"]["email"] == first_user_data["email"]
+
+    # a substring of an existing email must not match that account
+    res = client.post(
+        f"{auth_route}/login/",
+        data={"username": "ester@gmail.com", "password": first_user["password"]},
+    )
+    assert res.status_code == 400
+
+
 def test_resend_verification(client, second_user):
     email_data = {"email": second_user_data["email"]}
     client: TestClient = client
@@ -80,6 +198,21 @@ def test_me(first_auth_client):
     assert res.json().get("data")["email"] == first_user_data["email"]
 
 
+def test_me_principal_cache(first_auth_client):
+    client: TestClient = first_auth_client
+
+    res = client.get(f"{auth_route}/me/")
+    assert res.status_code == 200
+    assert principal_cache.get(first_user_data["email"]) is not None
+
+    res = client.patch(f"{auth_route}/update/", json={"first_name": "cached"})
+    assert res.status_code == 200
+    assert principal_cache.get(first_user_data["email"]) is None
+
+    res = client.get(f"{auth_route}/me/")
+    assert res.json().get("data")["first_name"] == "cached"
+
+
 def test_update(first_auth_client):
     client: TestClient = first_auth_client
 
@@ -111,6 +244,84 @@ def test_auth_refresh(client, first_user_login):
     assert res.json().get("message") == "New access token created successfully"
 
 
+def test_auth_refresh_rotates(client, first_user, first_user_login):
+    client: TestClient = client
+    old_token = first_user_login["refresh_token"]["token"]
+    # a second device logging in keeps the first session alive
+    res = client.post(
+        f"{auth_route}/login/",
+        data={"username": first_user["email"], "password": first_user["password"]},
+    )
+    assert res.status_code == 200
+
+    res = client.get("/api/v1/auth/refresh/", headers={"Refresh-Tok": old_token})
+    assert res.status_code == 200
+    new_token = res.json().get("refresh_token")["token"]
+    assert new_token != old_token
+
+    # the rotated out token is no longer accepted
+    res = client.get("/api/v1/auth/refresh/", headers={"Refresh-Tok": old_token})
+    assert res.status_code == 401
+    res = client.get("/api/v1/auth/refresh/", headers={"Refresh-Tok": new_token})
+    assert res.status_code == 200
+
+
+def test_login_caps_sessions_per_user(client, first_user, monkeypatch):
+    client: TestClient = client
+    monkeypatch.setattr(auth_settings, "max_sessions_per_user", 2)
+    refresh_tokens = []
+    for _ in range(3):
+        res = client.post(
+            f"{auth_route}/login/",
+            data={"username": first_user["email"], "password": first_user["password"]},
+        )
+        assert res.status_code == 200
+        refresh_tokens.append(res.json().get("data")["refresh_token"]["token"])
+
+    # the oldest session was logged out by the third login
+    res = client.get(f"{auth_route}/refresh/", headers={"Refresh-Tok": refresh_tokens[0]})
+    assert res.status_code == 401
+    for refresh_token in refresh_tokens[1:]:
+        res = client.get(f"{auth_route}/refresh/", headers={"Refresh-Tok": refresh_token})
+        assert res.status_code == 200
+
+
+def test_auth_refresh_concurrent_single_winner(
+    client, first_user_login, monkeypatch
+):
+    client: TestClient = client
+    token = first_user_login["refresh_token"]["token"]
+    get_token_by_hash = TokenRepo.get_token_by_hash
+    seen = []
+
+    async def read_before_rotation(self, token_hash):
+        # the second request read the row before the first one rotated it
+        if seen:
+            return seen[0]
+        row = await get_token_by_hash(self, token_hash)
+        user = row.user
+        seen.append(
+            SimpleNamespace(
+                id=row.id,
+                token_hash=row.token_hash,
+                user=SimpleNamespace(
+                    id=user.id,
+                    email=user.email,
+                    is_verified=user.is_verified,
+                    is_premium=user.is_premium,
+                    token_version=user.token_version,
+                ),
+            )
+        )
+        return row
+
+    monkeypatch.setattr(TokenRepo, "get_token_by_hash", read_before_rotation)
+    res = client.get("/api/v1/auth/refresh/", headers={"Refresh-Tok": token})
+    assert res.status_code == 200
+    res = client.get("/api/v1/auth/refresh/", headers={"Refresh-Tok": token})
+    assert res.status_code == 401
+
+
 def test_password_change(first_auth_client, first_user):
     client: TestClient = first_auth_client
     res = client.patch(
@@ -121,6 +332,34 @@ def test_password_change(first_auth_client, first_user):
     assert res.json().get("message") == "Password changed successfully"
 
 
+def test_password_change_revokes_refresh_tokens(
+    first_auth_client, first_user, first_user_login
+):
+    client: TestClient = first_auth_client
+    refresh_token = first_user_login["refresh_token"]["token"]
+    res = client.patch(
+        f"{auth_route}/change-password/",
+        json={"password": "new_password", "old_password": first_user["password"]},
+    )
+    assert res.status_code == 200
+
+    res = client.get(f"{auth_route}/refresh/", headers={"Refresh-Tok": refresh_token})
+    assert res.status_code == 401
+
+
+def test_password_reset_revokes_refresh_tokens(client, first_user, first_user_login):
+    client: TestClient = client
+    refresh_token = first_user_login["refresh_token"]["token"]
+    res = client.post(
+        f"{auth_route}/password-reset/complete/{auth_token(first_user['email'])}/",
+        json={"password": "changedone"},
+    )
+    assert res.status_code == 200
+
+    res = client.get(f"{auth_route}/refresh/", headers={"Refresh-Tok": refresh_token})
+    assert res.status_code == 401
+
+
 def test_password_reset(client, first_user):
     client: TestClient = client
 
@@ -144,3 +383,42 @@ def test_password_reset_done(client, first_user):
 
     assert res.status_code == 200
     assert res.json().get("message") == "User password set successfully"
+
+
+def test_decode_token_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+    token = create_access_token({"id": 1, "email": "cached@example.com"})
+
+    claims = decode_token(token, access_secret_key, cache)
+    assert claims["email"] == "cached@example.com"
+    assert len(cache) == 1
+    # served from the cache, the signature is not checked again
+    assert decode_token(token, access_secret_key, cache) is claims
+    assert cache.hits == 1
+    # single use tokens, refresh tokens, are verified without a cache
+    assert decode_token(token, access_secret_key) == claims
+
+
+def test_stateless_access_token(client, first_user, monkeypatch):
+    client: TestClient = client
+    monkeypatch.setattr(auth_settings, "stateless_access_tokens", True)
+    res = client.post(
+        f"{auth_route}/login/",
+        data={"username": first_user["email"], "password": first_user["password"]},
+    )
+    assert res.status_code == 200
+    headers = {"Authorization": f"Bearer {res.json().get('access_token')}"}
+
+    res = client.get(f"{auth_route}/me/", headers=headers)
+    assert res.status_code == 200
+    assert res.json().get("data")["first_name"] == first_user["first_name"]
+
+    # a password change bumps the token version and revokes the token
+    res = client.patch(
+        f"{auth_route}/change-password/",
+        json={"password": "new_password", "old_password": first_user["password"]},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    res = client.get(f"{auth_route}/me/", headers=headers)
+    assert res.status_code == 401
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.app.utils.db_utils import (
+    HashingExecutor,
+    async_verify_password,
+    hash_password,
+)
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_rejects_past_max_pending():
+    executor = HashingExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+    running = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+    assert executor.stats()["in_flight"] == 1
+
+    # the one pending slot is taken, the next job is turned away
+    with pytest.raises(HTTPException) as exc:
+        await executor.run(lambda: None)
+    assert exc.value.status_code == 503
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    assert await running is True
+    stats = executor.stats()
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["completed"] == 1
+
+    # capacity is back once the job completed
+    assert await executor.run(lambda: "done") == "done"
+    assert executor.stats()["completed"] == 2
+    executor.executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_counts_failed_jobs_as_done():
+    executor = HashingExecutor(max_workers=1, max_pending=1)
+
+    def fail():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        await executor.run(fail)
+    assert executor.stats()["in_flight"] == 0
+    assert await executor.run(lambda: 1) == 1
+    executor.executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_verify_password():
+    hashed = hash_password("correct horse")
+    assert await async_verify_password(hashed, "correct horse") is True
+    assert await async_verify_password(hashed, "wrong horse") is False
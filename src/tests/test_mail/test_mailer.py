@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from src.app import celery_jobs
+from src.app.celery_jobs import MailNotSent, enqueue_mail, send_mail_task
+from src.app.utils.mailer_util import SMTPPool, build_message, template_renderer
+
+
+class LocalSMTPServer:
+    # minimal plaintext SMTP stand-in, records connections and messages
+    def __init__(self) -> None:
+        self.connections = 0
+        self.messages = []
+        self.server = None
+        # hang up on the next MAIL of a connection that already delivered,
+        # the way a server drops a connection it considers idle
+        self.drop_next_reuse = False
+        self.dropped = 0
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 localhost ESMTP\r\n")
+        await writer.drain()
+        delivered = 0
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip().upper()
+            if command.startswith("MAIL") and delivered and self.drop_next_reuse:
+                self.drop_next_reuse = False
+                self.dropped += 1
+                break
+            if command.startswith("EHLO"):
+                writer.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif command.startswith(("HELO", "MAIL", "RCPT", "RSET", "NOOP")):
+                writer.write(b"250 OK\r\n")
+            elif command == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                data = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    data.append(data_line)
+                self.messages.append(b"".join(data))
+                delivered += 1
+                writer.write(b"250 OK\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"500 Unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_reuses_connection():
+    server = LocalSMTPServer()
+    port = await server.start()
+    pool = SMTPPool("127.0.0.1", port, start_tls=False, size=1, max_messages=2)
+
+    for i in range(3):
+        await pool.send(build_message(["test@gmail.com"], f"mail {i}", "<p>hi</p>"))
+    await pool.close()
+    await server.stop()
+
+    assert len(server.messages) == 3
+    # two messages on the first connection, then it is recycled
+    assert server.connections == 2
+    assert pool.connections_opened == 2
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_reconnects_after_disconnect():
+    server = LocalSMTPServer()
+    port = await server.start()
+    pool = SMTPPool("127.0.0.1", port, start_tls=False, size=1)
+
+    await pool.send(build_message(["test@gmail.com"], "first", "<p>hi</p>"))
+    # the server hangs up once the pooled connection is reused, which the
+    # client only learns from the failed send
+    server.drop_next_reuse = True
+    await pool.send(build_message(["test@gmail.com"], "second", "<p>hi</p>"))
+    await pool.close()
+    await server.stop()
+
+    assert server.dropped == 1
+    # the retry on a fresh connection delivered the second message
+    assert len(server.messages) == 2
+    assert b"Subject: second" in server.messages[1]
+    assert server.connections == 2
+    assert pool.connections_opened == 2
+
+
+def test_template_renderer_compiles_once():
+    template = template_renderer.get("user/verification.html")
+    assert template_renderer.get("/user/verification.html") is template
+
+    bodies = [
+        {"first_name": "Philip", "url": "http://localhost/verify/a/"},
+        {"first_name": "Ada", "url": "http://localhost/verify/b/"},
+    ]
+    html = [template_renderer.render("/user/verification.html", body) for body in bodies]
+
+    assert "Hi Philip," in html[0]
+    assert "Hi Ada," in html[1]
+    # both renders used the one compiled template
+    assert template_renderer.get("user/verification.html") is template
+
+
+def mail_outcomes(monkeypatch, *outcomes):
+    # send_mail stand-in returning the given statuses in order
+    calls = []
+
+    async def send_mail(recieptients, subject, body, template_name):
+        calls.append(subject)
+        return outcomes[len(calls) - 1]
+
+    monkeypatch.setattr(celery_jobs, "send_mail", send_mail)
+    return calls
+
+
+def test_send_mail_task_retries_with_backoff(monkeypatch):
+    calls = mail_outcomes(monkeypatch, False, False, True)
+    countdowns = []
+    retry = send_mail_task.retry
+
+    def record_retry(*args, **kwargs):
+        countdowns.append(kwargs.get("countdown"))
+        return retry(*args, **kwargs)
+
+    monkeypatch.setattr(send_mail_task, "max_retries", 5)
+    monkeypatch.setattr(send_mail_task, "retry", record_retry)
+    result = send_mail_task.apply((["a@example.com"], "retried", {}, "user/x.html"))
+
+    assert result.successful()
+    assert result.get() is True
+    assert len(calls) == 3
+    # exponential backoff with full jitter: 0..1s, then 0..2s
+    assert len(countdowns) == 2
+    assert 0 <= countdowns[0] <= 1
+    assert 0 <= countdowns[1] <= 2
+
+
+def test_send_mail_task_gives_up_after_max_retries(monkeypatch):
+    calls = mail_outcomes(monkeypatch, False, False, False)
+    monkeypatch.setattr(send_mail_task, "max_retries", 2)
+    # the failure log formats billiard's traceback, which python 3.11 cannot read
+    monkeypatch.setattr(logging.getLogger("celery.app.trace"), "disabled", True)
+    result = send_mail_task.apply((["a@example.com"], "failing", {}, "user/x.html"))
+
+    assert result.failed()
+    assert isinstance(result.result, MailNotSent)
+    # the first attempt and two retries
+    assert len(calls) == 3
+
+
+def test_send_mail_task_backoff_is_capped():
+    assert send_mail_task.autoretry_for == (MailNotSent,)
+    assert send_mail_task.retry_backoff is True
+    assert send_mail_task.retry_backoff_max == 600
+    assert send_mail_task.retry_jitter is True
+
+
+@pytest.mark.asyncio
+async def test_enqueue_mail_publish_failure(monkeypatch):
+    def broker_down(*args, **kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(send_mail_task, "delay", broker_down)
+    assert await enqueue_mail(["a@example.com"], "lost", {}, "user/x.html") is False
+
+
+@pytest.mark.asyncio
+async def test_enqueue_mail_publishes_off_shared_pool(monkeypatch):
+    threads = []
+
+    def delay(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+
+    monkeypatch.setattr(send_mail_task, "delay", delay)
+    assert await enqueue_mail(["a@example.com"], "queued", {}, "user/x.html") is True
+    assert threads[0].startswith("mail-publish")
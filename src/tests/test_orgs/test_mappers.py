@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, literal, select
+
+from src.app.utils.response_utils import model_response
+from src.auth.models import User
+from src.benchmarks.bench_org_mappers import build_members
+from src.organization import schemas
+from src.organization.mappers import (
+    org_dto,
+    org_member_dto,
+    org_member_response_dto,
+    user_dto,
+)
+
+
+def build_org(members: int, creator: bool = True):
+    # transient org shaped like org_repo.load_org results
+    org_members = build_members(members)
+    org = org_members[0].org
+    org.creator = org_members[0].member if creator else None
+    org.org_member = org_members
+    return org
+
+
+def legacy_json(response_model, content) -> dict:
+    # what the routes returned before the mappers: response_model validation
+    # of the service dict, then jsonable_encoder
+    return orjson.loads(
+        orjson.dumps(jsonable_encoder(response_model.parse_obj(content)))
+    )
+
+
+def mapper_json(response_model, content) -> dict:
+    return orjson.loads(model_response(response_model, content, 200).body)
+
+
+def list_resp(data) -> dict:
+    return {
+        "message": "ok",
+        "data": data,
+        "next_cursor": None,
+        "total": 1,
+        "status": 200,
+    }
+
+
+def legacy_org(org) -> dict:
+    # the old OrgService.orm_call, a copy so the instance is left alone
+    org_ = dict(org.__dict__)
+    org_["creator"] = org.creator
+    org_["members"] = org.org_member
+    return org_
+
+
+def legacy_org_member(org_member) -> dict:
+    # the old OrgService.member_orm_call
+    org_member_ = jsonable_encoder(org_member)
+    org_member_["org"] = org_member.org
+    org_member_["user"] = org_member.member
+    return org_member_
+
+
+def test_org_dto_matches_legacy_shape():
+    org = build_org(3)
+
+    body = mapper_json(schemas.MessageListOrgResp, list_resp([org_dto(org)]))
+
+    assert body == legacy_json(schemas.MessageListOrgResp, list_resp([legacy_org(org)]))
+    assert body["data"][0]["creator"]["email"] == "user0@example.com"
+    assert len(body["data"][0]["members"]) == 3
+    assert "_sa_instance_state" not in orjson.dumps(body).decode()
+
+
+def test_org_dto_deleted_creator():
+    org = build_org(2, creator=False)
+
+    body = mapper_json(schemas.MessageListOrgResp, list_resp([org_dto(org)]))
+
+    assert body["data"][0]["creator"] is None
+    assert body == legacy_json(schemas.MessageListOrgResp, list_resp([legacy_org(org)]))
+
+
+def test_org_dto_member_count():
+    org = build_org(2)
+    org.member_count = 25
+
+    dto = org_dto(org)
+
+    assert dto.member_count == 25
+    assert len(dto.members) == 2
+
+
+def test_org_member_response_dto_matches_legacy_shape():
+    org_members = build_members(3)
+
+    body = mapper_json(
+        schemas.MessageListOrgMemResp,
+        list_resp([org_member_response_dto(org_member) for org_member in org_members]),
+    )
+
+    assert body == legacy_json(
+        schemas.MessageListOrgMemResp,
+        list_resp([legacy_org_member(org_member) for org_member in org_members]),
+    )
+    assert body["data"][1] == {
+        "id": 1,
+        "org": {"name": "Bench Org", "slug": "bench-org"},
+        "user": {
+            "first_name": "first1",
+            "last_name": "last1",
+            "email": "user1@example.com",
+        },
+        "role": "Member",
+    }
+    assert "_sa_instance_state" not in orjson.dumps(body).decode()
+
+
+def test_mappers_read_core_rows():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        user_row = conn.execute(
+            select(
+                literal("Ada").label("first_name"),
+                literal("Lovelace").label("last_name"),
+                literal("ada@example.com").label("email"),
+            )
+        ).one()
+        member_row = conn.execute(select(literal("Admin").label("role"))).one()
+
+    user = User(first_name="Ada", last_name="Lovelace", email="ada@example.com")
+    assert user_dto(user_row) == user_dto(user)
+    assert user_dto(None) is None
+
+    # a Core row has no relationships, the member comes from its own row
+    org_member = org_member_dto(SimpleNamespace(role=member_row.role, member=user_row))
+    assert org_member.role == "Admin"
+    assert org_member.member == user_dto(user)
@@ -29,6 +29,19 @@ def test_org_premium(
     )
 
 
+def test_org_slot_freed_on_delete(
+    first_auth_client, first_user_org_created, first_user_2nd_org_created
+):
+    client: TestClient = first_auth_client
+
+    slug = first_user_org_created["data"]["slug"]
+    res = client.delete(f"{org_route}/{slug}/delete/")
+    assert res.status_code == 204
+
+    res = client.post(f"{org_route}/create/", json={"name": "stripe"})
+    assert res.status_code == 201
+
+
 def test_orgs(first_auth_client, first_user_2nd_org_created, first_user_org_created):
     client: TestClient = first_auth_client
 
@@ -37,6 +50,7 @@ def test_orgs(first_auth_client, first_user_2nd_org_created, first_user_org_crea
     assert res.status_code == 200
     assert type(res.json().get("data")) == list
     assert res.json().get("message") == "User Orgs retrieved successfully"
+    assert res.json().get("total") == 2
 
 
 def test_get_org(first_auth_client, first_user_org_created):
@@ -47,7 +61,10 @@ def test_get_org(first_auth_client, first_user_org_created):
     assert res.status_code == 200
     assert res.json().get("message") == "Org Returned"
     assert res.json().get("data")["slug"] == slug
-    pass
+    # creator and members are loaded onto the org resolved by the dependency
+    data = res.json().get("data")
+    assert data["creator"]["email"] == data["members"][0]["member"]["email"]
+    assert data["members"][0]["role"] == "Admin"
 
 
 def test_update_org(first_auth_client, first_user_org_created):
@@ -127,6 +144,118 @@ def test_get_all_org_members(
             assert data["role"] == "Member"
 
 
+def test_get_org_members_paginated(
+    first_auth_client, first_user_2nd_org_created, org_memb_2nd_join
+):
+    client: TestClient = first_auth_client
+    org_slug = first_user_2nd_org_created["slug"]
+
+    res = client.get(f"{org_route}/{org_slug}/members/", params={"limit": 1})
+    assert res.status_code == 200
+    assert len(res.json().get("data")) == 1
+    next_cursor = res.json().get("next_cursor")
+    assert type(next_cursor) == str
+
+    res = client.get(
+        f"{org_route}/{org_slug}/members/", params={"limit": 1, "cursor": next_cursor}
+    )
+    assert res.status_code == 200
+    assert len(res.json().get("data")) == 1
+    assert res.json().get("next_cursor") is None
+
+    # cursors are signed apart from invite tokens, neither passes as the other
+    res = client.post(
+        f"{org_route}/join/",
+        params={"token": next_cursor, "role_token": next_cursor},
+        json={"email": second_user_data["email"]},
+    )
+    assert res.status_code == 409
+    res = client.get(
+        f"{org_route}/{org_slug}/members/",
+        params={"cursor": gen_token(org_slug)},
+    )
+    assert res.status_code == 400
+
+
+def test_orgs_cursor_after_last_row_deleted(
+    first_auth_client, first_user_2nd_org_created
+):
+    client: TestClient = first_auth_client
+    res = client.get(f"{org_route}s/", params={"limit": 1})
+    assert res.status_code == 200
+    next_cursor = res.json().get("next_cursor")
+    last_slug = first_user_2nd_org_created["slug"]
+    assert client.delete(f"{org_route}/{last_slug}/delete/").status_code == 204
+
+    # the page after the cursor is empty, not a 404
+    res = client.get(f"{org_route}s/", params={"limit": 1, "cursor": next_cursor})
+    assert res.status_code == 200
+    assert res.json().get("data") == []
+    assert res.json().get("next_cursor") is None
+    # the user still belongs to the first org
+    assert res.json().get("total") == 1
+
+
+def test_org_members_cursor_after_last_row_deleted(
+    first_auth_client, first_user_2nd_org_created, org_memb_2nd_join
+):
+    client: TestClient = first_auth_client
+    org_slug = first_user_2nd_org_created["slug"]
+    res = client.get(f"{org_route}/{org_slug}/members/", params={"limit": 1})
+    next_cursor = res.json().get("next_cursor")
+    memb_id = org_memb_2nd_join["id"]
+    res = client.delete(f"{org_route}/{org_slug}/member/{memb_id}/delete/")
+    assert res.status_code == 204
+
+    res = client.get(
+        f"{org_route}/{org_slug}/members/", params={"limit": 1, "cursor": next_cursor}
+    )
+    assert res.status_code == 200
+    assert res.json().get("data") == []
+    assert res.json().get("next_cursor") is None
+
+
+def test_orgs_embed_first_members(
+    first_auth_client, first_user_2nd_org_created, org_memb_2nd_join, monkeypatch
+):
+    client: TestClient = first_auth_client
+    monkeypatch.setattr("src.organization.org_repository.EMBEDDED_MEMBERS", 1)
+
+    res = client.get(f"{org_route}s/")
+    assert res.status_code == 200
+    orgs = {org["slug"]: org for org in res.json().get("data")}
+    org = orgs[first_user_2nd_org_created["slug"]]
+    # only the first member, the admin, is embedded
+    assert len(org["members"]) == 1
+    assert org["members"][0]["member"]["email"] == first_user_data["email"]
+    assert org["member_count"] == 2
+
+    # single org responses are capped the same way
+    res = client.get(f"{org_route}/{first_user_2nd_org_created['slug']}/")
+    assert res.status_code == 200
+    assert len(res.json().get("data")["members"]) == 1
+    assert res.json().get("data")["member_count"] == 2
+
+
+def test_org_listings_no_repeated_queries(
+    first_auth_client, first_user_2nd_org_created, org_memb_2nd_join, query_counter
+):
+    client: TestClient = first_auth_client
+    org_slug = first_user_2nd_org_created["slug"]
+
+    urls = [
+        f"{org_route}/{org_slug}/members/",
+        f"{org_route}s/",
+        f"{org_route}/{org_slug}/",
+    ]
+    for url in urls:
+        with query_counter() as queries:
+            res = client.get(url)
+        assert res.status_code == 200
+        # one statement per table, never one per member
+        assert not queries.repeated(), queries.report()
+
+
 # def test_get_org_member(
 #     secnd_auth_client, first_user_2nd_org_created, test_org_memb_join, secnd_user_access
 # ):